@@ -0,0 +1,97 @@
+import threading
+
+from http_client import HttpError, get_client
+
+
+# The JSON endpoint behind jobs.apple.com search. It requires a CSRF token,
+# which the site hands out in a response header from CSRF_URL.
+CSRF_URL = "https://jobs.apple.com/api/csrfToken"
+SEARCH_URL = "https://jobs.apple.com/api/role/search"
+DETAILS_URL = "https://jobs.apple.com/en-us/details"
+
+PAGE_SIZE = 20
+HEADERS = {
+    "Content-Type": "application/json",
+    "Origin": "https://jobs.apple.com",
+    "Referer": "https://jobs.apple.com/en-us/search",
+}
+
+_csrf_token = None
+_csrf_lock = threading.Lock()
+
+
+class AppleApiError(Exception):
+    """Raised when the search API can't be used, so callers can fall back to the browser."""
+
+
+def _get_csrf_token(client, refresh=False):
+    """One token is shared by every keyword search in the process."""
+    global _csrf_token
+    with _csrf_lock:
+        if _csrf_token and not refresh:
+            return _csrf_token
+        try:
+            r = client.get(CSRF_URL, headers=HEADERS)
+        except HttpError as e:
+            raise AppleApiError(f"CSRF request failed: {e}") from e
+        token = r.headers.get("x-apple-csrf-token")
+        if r.status_code != 200 or not token:
+            raise AppleApiError(f"No CSRF token (status {r.status_code})")
+        _csrf_token = token
+        return token
+
+
+def _to_job(result):
+    """Maps one API search result onto the same dict the DOM scraper builds."""
+    position_id = result.get("positionId") or result.get("id", "")
+    slug = result.get("transformedPostingTitle", "")
+    locations = result.get("locations") or []
+    if locations:
+        loc = locations[0]
+        location = ", ".join(part for part in (loc.get("name"), loc.get("countryName")) if part)
+    else:
+        location = "Unknown"
+    return {
+        "id": position_id,
+        "title": result.get("postingTitle", "").strip(),
+        "company": "Apple",
+        "location": location,
+        "url": f"{DETAILS_URL}/{position_id}/{slug}",
+    }
+
+
+def search_pages(keyword, max_pages=5, client=None):
+    """Yields (jobs, total_records) per page for `keyword` in the US, newest first.
+
+    The caller decides when to stop (e.g. once it has caught up with previous runs);
+    iteration also ends on a short page or after `max_pages`.
+    """
+    client = client or get_client()
+    token = _get_csrf_token(client)
+    for page_number in range(1, max_pages + 1):
+        payload = {
+            "query": keyword,
+            "filters": {"postingpostLocation": ["postLocation-USA"]},
+            "page": page_number,
+            "locale": "en-us",
+            "sort": "newest",
+        }
+        try:
+            r = client.post(SEARCH_URL, json=payload, headers={**HEADERS, "x-apple-csrf-token": token})
+            if r.status_code in (401, 403):
+                # Token expired; get a fresh one and retry once
+                token = _get_csrf_token(client, refresh=True)
+                r = client.post(SEARCH_URL, json=payload, headers={**HEADERS, "x-apple-csrf-token": token})
+            if r.status_code != 200:
+                raise AppleApiError(f"Search failed for '{keyword}' page {page_number}: HTTP {r.status_code}")
+            data = r.json()
+        except (HttpError, ValueError) as e:
+            raise AppleApiError(f"Search failed for '{keyword}' page {page_number}: {e}") from e
+
+        if "searchResults" not in data:
+            raise AppleApiError(f"Unexpected response for '{keyword}': {list(data)[:5]}")
+        results = data["searchResults"] or []
+        yield [_to_job(result) for result in results], data.get("totalRecords", 0)
+
+        if len(results) < PAGE_SIZE or page_number * PAGE_SIZE >= data.get("totalRecords", 0):
+            return
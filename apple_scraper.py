@@ -0,0 +1,70 @@
+from urllib.parse import quote_plus
+
+import apple_api
+import metrics
+from extract import extract_records
+from scrapers import Scraper, register
+
+
+@register("apple")
+class AppleScraper(Scraper):
+    """jobs.apple.com: the JSON search API per query, with the rendered search page as fallback.
+
+    `url` is the search page (used only by the fallback); each entry in `queries` is a keyword.
+    """
+
+    def submit_query(self, engine, ctx, query):
+        engine.submit_http(self.name, self.scrape_api, ctx, query, fallback=self.scrape_page)
+
+    def scrape_api(self, ctx, query):
+        """Raises apple_api.AppleApiError so the engine can fall back to scrape_page."""
+        self.log_start(query, " API")
+        pages = apple_api.search_pages(query, max_pages=self.max_pages, client=ctx.client)
+        return self.emit_all(ctx, self.crawl_sorted(ctx, query, pages))
+
+    async def scrape_page(self, page, ctx, query):
+        self.log_start(query)
+        emitted = 0
+
+        try:
+            # location=united-states-USA provides better filtering
+            url = f"{self.url}?search={quote_plus(query)}&sort=relevance&sort=date&location=united-states-USA"
+            with metrics.timer("goto"):
+                await page.goto(url, timeout=60000)
+
+            try:
+                with metrics.timer("wait"):
+                    await page.wait_for_selector('h3 a', timeout=10000)
+            except Exception:
+                print(f"    [!] No results or timeout for '{query}'")
+                return emitted
+
+            # Selector derived from inspection: div.job-list-item
+            rows = await extract_records(page, '.job-list-item', 'h3 a')
+
+            jobs = []
+            for row in rows[:20]:
+                href = row["href"]
+                if not href: continue
+
+                # Row text pattern: "... Location | City | Actions"
+                full_text = row["row_text"]
+                location = "Unknown"
+                if "Location" in full_text:
+                    # Extract everything after "Location" and before "Actions" or end of line
+                    location = full_text.split("Location", 1)[1].split("Actions")[0].replace("|", "").strip()
+
+                jobs.append({
+                    "id": href.split('/')[3] if len(href.split('/')) > 3 else href,
+                    "title": row["text"],
+                    "company": self.company,
+                    "location": location,
+                    "url": f"https://jobs.apple.com{href}"
+                })
+            emitted = await self.aemit(ctx, jobs)
+
+        except Exception as e:
+            print(f"[!] {self.name} scrape error for {query}: {e}")
+            metrics.error(f"scrape error for {query}: {e}")
+
+        return emitted
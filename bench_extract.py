@@ -0,0 +1,56 @@
+import asyncio
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from extract import extract_records
+
+
+# Compares per-element locator reads (the old scrape_microsoft_ai loop) with
+# the single batched extract_records call, on a synthetic page of job cards.
+# Usage: python bench_extract.py [number_of_cards]
+
+
+def build_page(n):
+    cards = "\n".join(
+        f'<div class="card"><a href="/job/role-{i}/">Software Engineer {i}</a>'
+        f'<span>Redmond, United States</span></div>'
+        for i in range(n)
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+async def per_element(page):
+    round_trips = 1
+    records = []
+    for link in await page.locator("a").all():
+        text = (await link.inner_text()).strip()
+        href = await link.get_attribute("href")
+        parent_text = await link.locator("xpath=..").inner_text()
+        round_trips += 3
+        records.append({"text": text, "href": href, "parent_text": parent_text})
+    return records, round_trips
+
+
+async def batched(page):
+    return await extract_records(page, "a"), 1
+
+
+async def run(n):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(build_page(n))
+
+        for name, fn in (("per-element", per_element), ("batched", batched)):
+            start = time.perf_counter()
+            records, round_trips = await fn(page)
+            elapsed = time.perf_counter() - start
+            print(f"[*] {name:12} {len(records)} records, {round_trips} round trips, {elapsed * 1000:.0f} ms")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
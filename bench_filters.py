@@ -0,0 +1,92 @@
+import json
+import sys
+import time
+
+from scrapers import load_sources
+
+
+# Checks every source's compiled filters against a labelled corpus of titles,
+# then times them against the old per-keyword substring scan.
+# Usage: python bench_filters.py [corpus.json] [repeats]
+# Exits non-zero if any corpus entry gets the wrong verdict.
+
+CORPUS_FILE = "filter_corpus.json"
+
+
+def substring_passes(job, filters):
+    """The filter the scrapers used before filters.py: plain substring checks."""
+    strip = lambda kws: [kw.rstrip("*") for kw in kws]
+    title = job["title"].lower()
+    if any(kw in title for kw in strip(filters.get("exclude", []))):
+        return False
+    require = strip(filters.get("require", []))
+    if require and not any(kw in title for kw in require):
+        return False
+
+    location = job["location"].lower()
+    if any(kw in location for kw in strip(filters.get("exclude_locations", []))):
+        return False
+    require_locations = strip(filters.get("require_locations", []))
+    if require_locations:
+        where = f"{location} {job.get('url', '').lower()}"
+        if not any(kw in where for kw in require_locations):
+            return False
+    return True
+
+
+def check_corpus(sources, corpus):
+    failures = 0
+    for entry in corpus:
+        job = {"title": entry["title"], "location": entry["location"], "url": entry.get("url", "")}
+        accepted, reason = sources[entry["source"]].job_filter.check(job)
+        old = substring_passes(job, sources[entry["source"]].filters)
+        if accepted != entry["accept"]:
+            failures += 1
+            print(f"[!] {entry['source']}: '{entry['title']}' ({entry['location']}) -> {reason}, expected "
+                  f"{'accept' if entry['accept'] else 'reject'}")
+        elif old != entry["accept"]:
+            print(f"[-] {entry['source']}: '{entry['title']}' fixed (substring scan got it wrong; now {reason})")
+    return failures
+
+
+def bench(sources, corpus, repeats):
+    by_source = {}
+    for entry in corpus:
+        job = {"title": entry["title"], "location": entry["location"], "url": entry.get("url", "")}
+        by_source.setdefault(entry["source"], []).append(job)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for name, jobs in by_source.items():
+            filters = sources[name].filters
+            for job in jobs:
+                substring_passes(job, filters)
+    substring_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for name, jobs in by_source.items():
+            sources[name].job_filter.evaluate(jobs)
+    compiled_time = time.perf_counter() - start
+
+    checks = repeats * len(corpus)
+    print(f"[*] {checks} checks: substring {substring_time * 1e6 / checks:.2f} us/job, "
+          f"compiled {compiled_time * 1e6 / checks:.2f} us/job")
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else CORPUS_FILE
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    sources = {source.name: source for source in load_sources()}
+    with open(path, "r") as f:
+        corpus = json.load(f)
+
+    failures = check_corpus(sources, corpus)
+    print(f"[*] Corpus: {len(corpus) - failures}/{len(corpus)} verdicts as expected")
+    bench(sources, corpus, repeats)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from playwright.async_api import async_playwright
+
+import blocking
+import metrics
+from engine import Engine
+from enrichment import DetailCache, Enricher
+from http_client import get_client
+from incremental import CrawlState
+from pipeline import Pipeline
+from replay import FIXTURES_DIR, HarStore, RecordingClient, ReplayClient
+from scrapers import RunContext, load_sources
+from seen_store import SeenStore
+
+
+# Offline benchmark of the configured sources against recorded fixtures.
+#
+#   python bench_replay.py --record [source ...] live run that (re)records fixtures/
+#   python bench_replay.py [source ...]          replay with no network and report timings
+#
+# Each replay round starts with an empty seen store and crawl state, so every
+# source does a full crawl. --json saves the results; --baseline compares against
+# a saved file and exits non-zero on a slowdown beyond --tolerance or a changed
+# job count. A baseline may leave out the timings (bench_baseline.json only has
+# the job counts the synthetic fixtures must produce, see synthetic_fixtures.py);
+# --baseline can be given more than once, and a missing file is an error.
+
+ROUNDS = 3
+TOLERANCE = 0.25
+
+
+class Collector:
+    """Stands in for the Notifier: keeps the alerts instead of sending them."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def push(self, job):
+        self.jobs.append(job)
+
+
+async def run_once(sources, client, har):
+    with tempfile.TemporaryDirectory() as tmp:
+        seen_jobs = SeenStore(os.path.join(tmp, "seen_jobs.jsonl"), None)
+        crawl_state = CrawlState(os.path.join(tmp, "crawl_state.json"))
+        # Details are fetched through the same client, so they are recorded and replayed too
+        enricher = Enricher(client, DetailCache(os.path.join(tmp, "details")))
+        pipeline = Pipeline(seen_jobs, Collector(), crawl_state, enricher)
+        pipeline.start()
+        ctx = RunContext(seen_jobs, pipeline.notifier, crawl_state, client, pipeline)
+
+        start = time.perf_counter()
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=blocking.CHROMIUM_ARGS)
+            engine = Engine(browser, site_limits={source.name: source.concurrency for source in sources}, har=har)
+            for source in sources:
+                source.submit(engine, ctx)
+            scanned = await engine.run()
+            await browser.close()
+        pipeline.close()
+        enricher.close()
+        results = {site: 0 for site in scanned}
+        results.update(pipeline.take_counts())
+        elapsed = time.perf_counter() - start
+
+    latencies = {site: end - begin for site, (begin, end) in engine.timings.items()}
+    return elapsed, results, latencies
+
+
+def record(sources):
+    client = RecordingClient(get_client())
+    har = HarStore(mode="record")
+    elapsed, results, _ = asyncio.run(run_once(sources, client, har))
+    saved = client.save()
+    for site, count in results.items():
+        print(f"[*] {site}: {count} jobs, {har.requests.get(site, 0)} browser requests recorded")
+    print(f"[+] Recorded {saved} HTTP exchanges and HAR files to {FIXTURES_DIR}/ in {elapsed:.1f}s")
+
+
+def bench(sources, rounds):
+    totals, per_site, counts = [], {}, None
+    client = har = None
+    for n in range(rounds):
+        client = ReplayClient()
+        har = HarStore(mode="replay")
+        elapsed, results, latencies = asyncio.run(run_once(sources, client, har))
+        totals.append(elapsed)
+        for site, latency in latencies.items():
+            per_site.setdefault(site, []).append(latency)
+        if counts is not None and results != counts:
+            print(f"[!] Round {n + 1} found different jobs than round 1: {results} vs {counts}")
+        counts = results
+        print(f"[*] Round {n + 1}: {elapsed:.2f}s")
+
+    client.report()
+    return {
+        "end_to_end": statistics.median(totals),
+        "http_requests": sum(client.requests.values()),
+        "peak_rss_mb": metrics.peak_rss_mb(),
+        "sites": {
+            site: {
+                "latency": statistics.median(values),
+                "browser_requests": har.requests.get(site, 0),
+                "jobs": counts.get(site, 0),
+            }
+            for site, values in per_site.items()
+        },
+    }
+
+
+def print_results(results):
+    rss = f"{results['peak_rss_mb']:.0f} MB" if results["peak_rss_mb"] is not None else "n/a"
+    print(f"[*] End to end: {results['end_to_end']:.2f}s (median), {results['http_requests']} HTTP requests, "
+          f"peak RSS {rss}")
+    for site, r in sorted(results["sites"].items()):
+        print(f"[*] {site}: {r['latency']:.2f}s, {r['browser_requests']} browser requests, {r['jobs']} jobs")
+
+
+def compare(results, baseline, tolerance):
+    """Prints regressions against `baseline`; returns how many there were.
+    Only the fields the baseline has are checked."""
+    regressions = []
+    limit = 1 + tolerance
+    if "end_to_end" in baseline and results["end_to_end"] > baseline["end_to_end"] * limit:
+        regressions.append(f"end to end {baseline['end_to_end']:.2f}s -> {results['end_to_end']:.2f}s")
+    for site, before in baseline["sites"].items():
+        now = results["sites"].get(site)
+        if now is None:
+            regressions.append(f"{site} missing")
+            continue
+        if "latency" in before and now["latency"] > before["latency"] * limit:
+            regressions.append(f"{site} {before['latency']:.2f}s -> {now['latency']:.2f}s")
+        if "jobs" in before and now["jobs"] != before["jobs"]:
+            regressions.append(f"{site} found {now['jobs']} jobs, baseline {before['jobs']}")
+    for line in regressions:
+        print(f"[!] Regression: {line}")
+    return len(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay scraper runs offline.")
+    parser.add_argument("--record", action="store_true", help="run live and save fixtures instead")
+    parser.add_argument("sources", nargs="*", help="source names from sources.toml (default all)")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", action="append", default=[],
+                        help="compare against results saved with --json (repeatable)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, e.g. 0.25 = 25%%")
+    args = parser.parse_args()
+
+    for path in args.baseline:
+        if not os.path.exists(path):
+            print(f"[!] Baseline {path} not found")
+            return 2
+
+    sources = load_sources()
+    if args.sources:
+        sources = [source for source in sources if source.name in args.sources]
+
+    if args.record:
+        record(sources)
+        return 0
+
+    results = bench(sources, args.rounds)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    regressions = 0
+    for path in args.baseline:
+        print(f"[*] Comparing with {path}")
+        with open(path, "r") as f:
+            regressions += compare(results, json.load(f), args.tolerance)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
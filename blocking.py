@@ -0,0 +1,155 @@
+from urllib.parse import urlparse
+
+
+# --- CONFIGURATION ---
+# Set to False to load every page unmodified (e.g. when debugging a selector).
+BLOCKING_ENABLED = True
+
+# Resource types we never need: the scrapers only read text and hrefs.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "texttrack", "manifest"}
+
+# Analytics / ad hosts. A request is blocked if its host is one of these or a subdomain of one.
+TRACKER_DOMAINS = {
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook.net", "hotjar.com", "segment.io", "segment.com",
+    "clarity.ms", "bat.bing.com", "omtrdc.net", "demdex.net", "adobedtm.com", "2o7.net",
+    "nr-data.net", "optimizely.com", "quantserve.com", "scorecardresearch.com",
+    "ads.linkedin.com", "analytics.twitter.com", "ads-twitter.com", "analytics.tiktok.com",
+}
+
+# Resource types a site still needs, on top of documents/scripts/XHR.
+# Microsoft AI lazy-loads postings on scroll, which depends on real layout.
+SITE_ALLOWLISTS = {
+    "Microsoft AI": {"stylesheet"},
+}
+
+# Chromium flags for short-lived headless scraping sessions
+CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-component-update",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+]
+
+# With a persistent profile, requests can't be routed (routing turns off Chromium's
+# HTTP cache), so blocking falls back to URL patterns. These stand in for resource types.
+BLOCKED_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheet": ["css"],
+    "media": ["mp4", "webm", "mp3", "m3u8"],
+}
+
+# Options for every browser context: no service workers (they bypass routing), a small viewport.
+CONTEXT_OPTIONS = {
+    "service_workers": "block",
+    "viewport": {"width": 1280, "height": 800},
+}
+
+
+def is_tracker(url):
+    host = urlparse(url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in TRACKER_DOMAINS)
+
+
+def should_block(resource_type, url, allowed_types=()):
+    if is_tracker(url):
+        return True
+    return resource_type in BLOCKED_RESOURCE_TYPES and resource_type not in allowed_types
+
+
+def url_patterns(site):
+    """Chromium blocked-URL patterns equivalent to should_block() for `site`."""
+    allowed_types = SITE_ALLOWLISTS.get(site, set())
+    patterns = [f"*://*{domain}/*" for domain in sorted(TRACKER_DOMAINS)]
+    for resource_type, extensions in BLOCKED_EXTENSIONS.items():
+        if resource_type in BLOCKED_RESOURCE_TYPES and resource_type not in allowed_types:
+            for ext in extensions:
+                patterns += [f"*.{ext}", f"*.{ext}?*"]
+    return patterns
+
+
+class BlockStats:
+    """Counts blocked requests and bytes actually downloaded, across all contexts in a run.
+
+    Blocked requests are aborted before any response, so their size is unknown;
+    only their count (by resource type) is recorded. With a persistent profile,
+    requests answered from Chromium's disk cache are counted too.
+    """
+
+    def __init__(self):
+        self.blocked = {}
+        self.allowed_requests = 0
+        self.cached_requests = 0
+        self.loaded_bytes = 0
+
+    @property
+    def blocked_requests(self):
+        return sum(self.blocked.values())
+
+    def on_response(self, response):
+        try:
+            self.loaded_bytes += int(response.headers.get("content-length", 0))
+        except ValueError:
+            pass
+
+    def as_dict(self):
+        return {"blocked": self.blocked_requests, "allowed": self.allowed_requests,
+                "cached": self.cached_requests, "loaded_bytes": self.loaded_bytes}
+
+    def report(self):
+        by_type = ", ".join(f"{kind}: {n}" for kind, n in sorted(self.blocked.items(), key=lambda kv: -kv[1]))
+        print(f"[*] Blocked {self.blocked_requests} requests ({by_type or 'none'}); "
+              f"allowed {self.allowed_requests} requests ({self.cached_requests} from disk cache), "
+              f"{self.loaded_bytes / 1024:.0f} KB loaded")
+
+
+async def install(context, site, stats):
+    """Routes every request of `context` through the blocker using `site`'s allowlist."""
+    allowed_types = SITE_ALLOWLISTS.get(site, set())
+
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, allowed_types):
+            kind = "tracker" if is_tracker(request.url) else request.resource_type
+            stats.blocked[kind] = stats.blocked.get(kind, 0) + 1
+            await route.abort()
+        else:
+            stats.allowed_requests += 1
+            await route.continue_()
+
+    await context.route("**/*", handle)
+    context.on("response", stats.on_response)
+
+
+async def install_patterns(page, site, stats):
+    """Blocks by URL pattern on one page of a persistent context, leaving its HTTP cache on."""
+    session = await page.context.new_cdp_session(page)
+
+    def on_failed(event):
+        if event.get("blockedReason"):
+            kind = event.get("type", "other").lower()
+            stats.blocked[kind] = stats.blocked.get(kind, 0) + 1
+
+    def on_finished(request):
+        stats.allowed_requests += 1
+
+    def on_cached(event):
+        stats.cached_requests += 1
+
+    session.on("Network.loadingFailed", on_failed)
+    session.on("Network.requestServedFromCache", on_cached)
+    await session.send("Network.enable")
+    await session.send("Network.setBlockedURLs", {"urls": url_patterns(site)})
+    page.on("requestfinished", on_finished)
+    page.on("response", stats.on_response)
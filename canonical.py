@@ -0,0 +1,54 @@
+import hashlib
+import re
+from urllib.parse import urlsplit
+
+
+# Stable identities for postings, whatever shape of ID a scraper produced.
+#
+# A job's key is (company, native_id): the site's own posting number with URL
+# noise (query strings, locale, slugs, hosts) stripped, so the API and the
+# rendered page agree and a changed tracking parameter isn't a new job.
+# A fingerprint of the normalized title and location catches the same role
+# reposted under a new ID.
+
+# Tried in order against the raw ID; the first group of the first match is the native ID.
+ID_PATTERNS = [
+    re.compile(r"/careers/job/(\d+)"),        # Microsoft (Eightfold) href or API-built ID
+    # Workday externalPath /job/<location>/<title>_<requisition>, e.g. _JR2001234, _R-12345, _JR2001234-1
+    re.compile(r"/job/[^/?#]+/[^/?#]*_([A-Za-z0-9-]+)/?(?:[?#]|$)"),
+    re.compile(r"(?<![a-z0-9])(JR\d+)", re.IGNORECASE),  # bare Workday requisition, as older runs stored them
+    re.compile(r"/details/(\d+)"),            # Apple posting URL
+    re.compile(r"^(\d+)(?:-\d+)?$"),          # Apple position ID; the team suffix varies between views
+]
+
+# Suppress an alert for a new ID whose fingerprint was first seen this recently.
+# Off by default: distinct openings often share a title and listing location
+# (NVIDIA's many "New College Grad" reqs, "2 Locations"), so sources opt in.
+REPOST_WINDOW_DAYS = 0
+
+
+def native_id(raw_id):
+    """The site's own posting ID inside `raw_id` (an ID, path or full URL)."""
+    raw_id = str(raw_id).strip()
+    for pattern in ID_PATTERNS:
+        m = pattern.search(raw_id)
+        if m:
+            return m.group(1).upper()
+
+    # Anything else (e.g. a link page's href): the URL path without host, query or trailing slash
+    path = urlsplit(raw_id).path if "/" in raw_id else raw_id
+    return path.rstrip("/") or raw_id
+
+
+def job_key(company, raw_id):
+    return (company, native_id(raw_id))
+
+
+def _normalize(text):
+    return " ".join(re.sub(r"[^\w]+", " ", (text or "").lower()).split())
+
+
+def fingerprint(job):
+    """Short hash of a job's normalized title and location."""
+    content = f"{_normalize(job.get('title'))}|{_normalize(job.get('location'))}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
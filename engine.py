@@ -0,0 +1,145 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import blocking
+import metrics
+
+
+# --- CONFIGURATION ---
+# How many browser pages may be open at the same time across all sites.
+MAX_PAGES = 4
+
+# Threads for HTTP tasks. asyncio's default pool is tiny on CI runners (cpu + 4),
+# which would serialize a long list of API sources.
+HTTP_WORKERS = 32
+
+# Per-site concurrency limits (watcher.py fills these from each source's `concurrency`).
+# Sites not listed here get DEFAULT_SITE_LIMIT.
+SITE_LIMITS = {}
+DEFAULT_SITE_LIMIT = 1
+
+
+class BrowserPool:
+    """Hands out pages from a single browser, never more than `size` at once.
+
+    `browser` may instead be a persistent context (launch_persistent_context):
+    pages then share its profile and disk cache, and blocking uses URL patterns.
+    `har` (a replay.HarStore) records or replays each context's traffic.
+    """
+
+    def __init__(self, browser, size=MAX_PAGES, persistent=False, har=None):
+        self.browser = browser
+        self.persistent = persistent
+        self.har = har
+        self._slots = asyncio.Semaphore(size)
+        self.block_stats = blocking.BlockStats()
+
+    @asynccontextmanager
+    async def page(self, site=None):
+        async with self._slots:
+            if self.persistent:
+                page = await self.browser.new_page()
+                if blocking.BLOCKING_ENABLED:
+                    await blocking.install_patterns(page, site, self.block_stats)
+                try:
+                    yield page
+                finally:
+                    await page.close()
+                return
+
+            # A fresh context per task keeps cookies/storage from leaking between sites
+            # and lets each one get its own resource allowlist.
+            options = dict(blocking.CONTEXT_OPTIONS, **(self.har.context_options(site) if self.har else {}))
+            context = await self.browser.new_context(**options)
+            replaces_blocking = self.har is not None and await self.har.install(context, site)
+            if blocking.BLOCKING_ENABLED and not replaces_blocking:
+                await blocking.install(context, site, self.block_stats)
+            try:
+                yield await context.new_page()
+            finally:
+                await context.close()
+
+
+class Engine:
+    """Runs scraper tasks concurrently and records wall-clock time per site.
+
+    Browser tasks are coroutines `fn(page, *args)` that borrow a page from the pool.
+    HTTP tasks are plain functions `fn(*args)` run in a worker thread so they don't
+    wait behind the browser work. If an HTTP task raises and has a browser
+    `fallback`, the fallback is run with the same arguments. A browser task can
+    have a `probe`, a plain function run in a thread first; if it returns True
+    the task is skipped without borrowing a page.
+    """
+
+    def __init__(self, browser, max_pages=MAX_PAGES, site_limits=None, persistent=False, har=None):
+        self.pool = BrowserPool(browser, max_pages, persistent, har)
+        self.site_limits = dict(SITE_LIMITS if site_limits is None else site_limits)
+        self.timings = {}
+        self._semaphores = {}
+        self._tasks = []
+        self._executor = None
+
+    def _limit(self, site):
+        if site not in self._semaphores:
+            self._semaphores[site] = asyncio.Semaphore(self.site_limits.get(site, DEFAULT_SITE_LIMIT))
+        return self._semaphores[site]
+
+    def _record(self, site, start, end):
+        first, last = self.timings.get(site, (start, end))
+        self.timings[site] = (min(first, start), max(last, end))
+
+    async def _run(self, site, fn, args, needs_page, fallback=None, probe=None):
+        start = time.perf_counter()
+        # Everything this task does (and its worker threads) is counted against `site`
+        metrics.current_site.set(site)
+        try:
+            async with self._limit(site):
+                if probe is not None and await asyncio.to_thread(probe):
+                    return 0
+                if needs_page:
+                    async with self.pool.page(site) as page:
+                        return await fn(page, *args)
+                try:
+                    return await asyncio.to_thread(fn, *args)
+                except Exception as e:
+                    if fallback is None:
+                        raise
+                    print(f"[!] {site} HTTP backend failed ({e}), falling back to the browser.")
+                    metrics.error(f"HTTP backend failed: {e}")
+                async with self.pool.page(site) as page:
+                    return await fallback(page, *args)
+        except Exception as e:
+            print(f"[!] {site} task failed: {e}")
+            metrics.error(f"task failed: {e}")
+            return 0
+        finally:
+            self._record(site, start, time.perf_counter())
+
+    def submit_page(self, site, fn, *args, probe=None):
+        self._tasks.append((site, self._run(site, fn, args, needs_page=True, probe=probe)))
+
+    def submit_http(self, site, fn, *args, fallback=None):
+        self._tasks.append((site, self._run(site, fn, args, needs_page=False, fallback=fallback)))
+
+    async def run(self):
+        """Runs every submitted task and returns {site: jobs its tasks handed to the pipeline}."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=HTTP_WORKERS, thread_name_prefix="http")
+            asyncio.get_running_loop().set_default_executor(self._executor)
+
+        sites = [site for site, _ in self._tasks]
+        counts = await asyncio.gather(*(coro for _, coro in self._tasks))
+        self._tasks = []
+
+        results = {}
+        for site, count in zip(sites, counts):
+            results[site] = results.get(site, 0) + (count or 0)
+        return results
+
+    def report(self):
+        for site, (start, end) in self.timings.items():
+            print(f"[*] {site}: {end - start:.1f}s wall-clock")
+        if blocking.BLOCKING_ENABLED and (self.pool.block_stats.blocked or self.pool.block_stats.allowed_requests):
+            self.pool.block_stats.report()
@@ -0,0 +1,296 @@
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import metrics
+from canonical import job_key
+from locking import locked
+
+
+# Optional detail stage for sources with `enrich = true` (see pipeline.py).
+#
+# Listings only carry a title and a coarse location. For new postings that pass
+# the title filters, the detail view (a JSON endpoint or the posting page) is
+# fetched by a bounded thread pool and parsed into extra fields:
+#
+#   location          the posting's real location(s), replacing the listing's
+#   posted            ISO date the posting went up
+#   years_experience  fewest years of experience the description asks for
+#   team              team / department / job category
+#
+# Details are cached by job and by content hash, so a posting is fetched once
+# and identical bodies (the same posting under two IDs) are parsed once. Only
+# new postings reach this stage, so a run that finds nothing new fetches nothing.
+
+# --- CONFIGURATION ---
+DETAILS_DIR = os.path.join(".cache", "details")
+DETAILS_MAX_BYTES = 20 * 1024 * 1024  # least recently used details are evicted beyond this
+WORKERS = 8
+
+HTML_HEADERS = {"Accept": "text/html,application/xhtml+xml"}
+
+FIELDS = ("location", "posted", "years_experience", "team")
+
+# "2+ years of experience", "3-5 years of professional software development experience",
+# "at least 1 year experience". The lower bound of a range counts.
+YEARS_PATTERN = re.compile(
+    r"(\d{1,2})\s*(?:\+|(?:-|–|to)\s*\d{1,2})?\s*\+?\s*(?:or more\s+)?years?\b[^.;]{0,60}?\bexperience",
+    re.IGNORECASE,
+)
+
+LD_JSON_PATTERN = re.compile(r"<script[^>]*application/ld\+json[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+
+
+# --- Parsing ---
+
+def html_to_text(markup):
+    markup = re.sub(r"<(script|style)\b.*?</\1>", " ", markup or "", flags=re.IGNORECASE | re.DOTALL)
+    markup = re.sub(r"<br\s*/?>|</(p|li|div|h\d)>", ". ", markup, flags=re.IGNORECASE)
+    return " ".join(html.unescape(re.sub(r"<[^>]+>", " ", markup)).split())
+
+
+def parse_years(text):
+    """Fewest years of experience `text` asks for, or None if it doesn't say."""
+    years = [int(m.group(1)) for m in YEARS_PATTERN.finditer(text or "")]
+    years = [n for n in years if n <= 30]
+    return min(years) if years else None
+
+
+def posted_date(value):
+    """An ISO date from an ISO timestamp or epoch seconds, or None."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).date().isoformat()
+    if isinstance(value, str) and re.match(r"\d{4}-\d{2}-\d{2}", value):
+        return value[:10]
+    return None
+
+
+def _address(place):
+    address = place.get("address") if isinstance(place, dict) else None
+    if not isinstance(address, dict):
+        return None
+    country = address.get("addressCountry")
+    if isinstance(country, dict):
+        country = country.get("name")
+    parts = [address.get("addressLocality"), address.get("addressRegion"), country]
+    return ", ".join(part for part in parts if isinstance(part, str) and part)
+
+
+def _job_postings(markup):
+    for block in LD_JSON_PATTERN.findall(markup):
+        try:
+            data = json.loads(block.strip())
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if isinstance(item, dict) and "JobPosting" in str(item.get("@type")):
+                yield item
+
+
+def parse_html_details(body):
+    """Details from a posting page: its schema.org JobPosting (which most careers
+    sites publish for search engines), or failing that the years in the page text."""
+    markup = body.decode("utf-8", errors="replace")
+    for posting in _job_postings(markup):
+        places = posting.get("jobLocation") or []
+        places = places if isinstance(places, list) else [places]
+        locations = [location for location in map(_address, places) if location]
+        if posting.get("jobLocationType") == "TELECOMMUTE":
+            locations.append("Remote")
+        team = posting.get("occupationalCategory") or posting.get("industry")
+        return {
+            "location": "; ".join(dict.fromkeys(locations)) or None,
+            "posted": posted_date(posting.get("datePosted")),
+            "years_experience": parse_years(html_to_text(posting.get("description"))),
+            "team": team if isinstance(team, str) else None,
+        }
+    return {"years_experience": parse_years(html_to_text(markup))}
+
+
+def apply_details(job, details):
+    for field in FIELDS:
+        if details.get(field) not in (None, ""):
+            job[field] = details[field]
+
+
+# --- Cache ---
+
+class DetailCache:
+    """Parsed details on disk, content-addressed.
+
+    objects/<sha256 of the fetched body>.json holds the parsed fields, and
+    index.jsonl maps each (company, native_id) to the hash of its body. The index
+    is append-only and written under a file lock, so shard processes can share it.
+    evict() trims the objects to max_bytes and compacts the index.
+    """
+
+    def __init__(self, directory=DETAILS_DIR, max_bytes=DETAILS_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.hits = 0
+        self.fetched = 0
+        self.shared_bodies = 0
+        self._index = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._index, _ = self._read_index()
+
+    def _read_index(self):
+        """The index on disk (last line per key wins) and how many lines it has."""
+        index, lines = {}, 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    index[tuple(entry["key"])] = entry["content"]
+        return index, lines
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest + ".json")
+
+    def _read(self, digest):
+        try:
+            with open(self._object_path(digest), "r", encoding="utf-8") as f:
+                details = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(self._object_path(digest))  # marks it recently used for evict()
+        except OSError:
+            pass
+        return details
+
+    def get(self, key):
+        """Cached details for a job key, or None."""
+        digest = self._index.get(key)
+        details = self._read(digest) if digest else None
+        if details is not None:
+            with self._lock:
+                self.hits += 1
+        return details
+
+    def put(self, key, body, parse):
+        """Details for a fetched body; `parse` only runs if no other job had the same body."""
+        digest = hashlib.sha256(body).hexdigest()
+        details = self._read(digest)
+        if details is None:
+            details = {field: value for field, value in parse(body).items() if value is not None}
+            tmp_path = f"{self._object_path(digest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(details, f)
+            os.replace(tmp_path, self._object_path(digest))
+        else:
+            with self._lock:
+                self.shared_bodies += 1
+
+        with self._lock:
+            self.fetched += 1
+            self._index[key] = digest
+            with locked(self.index_path), open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": list(key), "content": digest}) + "\n")
+        return details
+
+    def evict(self):
+        """Removes least recently used objects until they fit in max_bytes, then drops
+        index lines that are superseded or point at a removed object. Returns how many
+        objects were removed."""
+        objects_dir = os.path.join(self.directory, "objects")
+        objects = {}
+        for item in os.scandir(objects_dir):
+            if item.name.endswith(".json"):
+                try:
+                    stat = item.stat()
+                except OSError:  # removed by another worker meanwhile
+                    continue
+                objects[item.name[:-len(".json")]] = (stat.st_size, stat.st_mtime)
+
+        total = sum(size for size, _ in objects.values())
+        removed = 0
+        for digest, (size, _) in sorted(objects.items(), key=lambda kv: kv[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            del objects[digest]
+            total -= size
+            removed += 1
+
+        # Rewritten under the lock, so lines other processes append meanwhile aren't lost
+        with self._lock, locked(self.index_path):
+            index, lines = self._read_index()
+            index = {key: digest for key, digest in index.items() if digest in objects}
+            if len(index) < lines:
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps({"key": list(key), "content": digest}) + "\n"
+                                 for key, digest in index.items())
+                os.replace(tmp_path, self.index_path)
+            self._index = index
+        return removed
+
+    def report(self):
+        print(f"[*] Detail cache: {self.fetched} postings fetched ({self.shared_bodies} with a body seen before), "
+              f"{self.hits} answered from cache")
+
+
+# --- Fetching ---
+
+class Enricher:
+    """Fills in detail fields on new postings, fetching uncached ones concurrently."""
+
+    def __init__(self, client, cache=None, workers=WORKERS):
+        self.client = client
+        self.cache = cache if cache is not None else DetailCache()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich")
+
+    def enrich(self, scraper, jobs):
+        """Updates `jobs` in place with whatever details could be found. Returns how many were fetched."""
+        missing = []
+        for job in jobs:
+            details = self.cache.get(job_key(job["company"], job["id"]))
+            if details is None:
+                missing.append(job)
+            else:
+                apply_details(job, details)
+        if missing:
+            with metrics.timer("enrich", site=scraper.name):
+                list(self._pool.map(lambda job: self._fetch(scraper, job), missing))
+        return len(missing)
+
+    def _fetch(self, scraper, job):
+        # Attribute the request timings to the source, as its own tasks would
+        metrics.current_site.set(scraper.name)
+        try:
+            url, headers, parse = scraper.detail_request(job)
+            response = self.client.get(url, headers=headers)
+            if response.status_code != 200:
+                metrics.error(f"details HTTP {response.status_code} for {job['id']}")
+                return
+            details = self.cache.put(job_key(job["company"], job["id"]), response.content, parse)
+        except Exception as e:
+            # Best effort: a bad body, parser bug or disk error alerts with the listing's fields
+            # rather than failing the batch
+            print(f"    [!] {scraper.name}: no details for {job['id']}: {e}")
+            metrics.error(f"details failed for {job['id']}: {e}")
+            return
+        apply_details(job, details)
+        metrics.count("enriched")
+
+    def report(self):
+        self.cache.report()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,41 @@
+import metrics
+
+
+# Batched in-page extraction.
+#
+# Reading a page element by element through locators costs one browser round trip
+# per call (inner_text, get_attribute, parent lookup, ...), which adds up to hundreds
+# per page. These helpers pull everything the scrapers need in a single
+# eval_on_selector_all call and return plain dicts, so filtering runs in Python.
+
+_EXTRACT_JS = """
+(elements, linkSelector) => elements.map(el => {
+    const link = linkSelector ? el.querySelector(linkSelector) : el;
+    const parent = el.parentElement;
+    return {
+        text: link ? link.innerText : "",
+        href: link ? link.getAttribute("href") : null,
+        parent_text: parent ? parent.innerText : "",
+        row_text: el.innerText,
+    };
+})
+"""
+
+
+@metrics.timed("extract")
+async def extract_records(page, selector, link_selector=None):
+    """Returns one dict per element matching `selector`, in a single round trip.
+
+    Each dict has:
+      text        - innerText of the first `link_selector` match inside the element
+                    (or of the element itself when no link_selector is given)
+      href        - its href attribute, or None
+      parent_text - innerText of the element's parent (e.g. a card holding a link)
+      row_text    - innerText of the element itself (e.g. a row with a location cell)
+    Rows where `link_selector` matches nothing come back with text "" and href None.
+    """
+    records = await page.eval_on_selector_all(selector, _EXTRACT_JS, link_selector)
+    for record in records:
+        record["text"] = (record["text"] or "").strip()
+    metrics.count("cards", len(records))
+    return records
@@ -0,0 +1,101 @@
+import re
+from datetime import date, timedelta
+
+
+# Compiled job filters shared by every scraper.
+#
+# Each rule list from sources.toml is compiled once into a single case-insensitive
+# regex. Keywords match whole words: "ml" no longer matches "html" and "ai" no
+# longer matches "maintenance". A trailing "*" makes a keyword a prefix
+# ("data*" matches "database"); keywords that start or end with punctuation
+# ("sr.", "/us-") only get a word boundary on their alphanumeric side.
+
+
+def _keyword_pattern(keyword):
+    keyword = keyword.strip()
+    prefix = keyword.endswith("*")
+    if prefix:
+        keyword = keyword[:-1]
+    pattern = r"\s+".join(re.escape(word) for word in keyword.split())
+    if re.match(r"\w", keyword):
+        pattern = r"\b" + pattern
+    if not prefix and re.search(r"\w$", keyword):
+        pattern = pattern + r"\b"
+    return pattern
+
+
+def compile_keywords(keywords):
+    """One regex matching any of `keywords`, or None for an empty list."""
+    if not keywords:
+        return None
+    # Longest first so the reported match is the most specific one
+    ordered = sorted({k for k in keywords if k.strip()}, key=len, reverse=True)
+    return re.compile("|".join(_keyword_pattern(k) for k in ordered), re.IGNORECASE)
+
+
+class JobFilter:
+    """A source's title and location rules, compiled once.
+
+    Rules (all optional): exclude / require on the title, exclude_locations /
+    require_locations on the location. require_locations also looks at the URL,
+    since some sites (Workday) only encode the country there.
+
+    Rules on fields the enrichment stage adds (see enrichment.py) pass jobs that
+    don't have the field: max_years_experience, posted_within_days (days) and
+    exclude_teams / require_teams.
+    """
+
+    def __init__(self, rules):
+        self.exclude = compile_keywords(rules.get("exclude"))
+        self.require = compile_keywords(rules.get("require"))
+        self.exclude_locations = compile_keywords(rules.get("exclude_locations"))
+        self.require_locations = compile_keywords(rules.get("require_locations"))
+        self.max_years = rules.get("max_years_experience")
+        self.posted_within_days = rules.get("posted_within_days")
+        self.exclude_teams = compile_keywords(rules.get("exclude_teams"))
+        self.require_teams = compile_keywords(rules.get("require_teams"))
+
+    def check_details(self, job):
+        """(accepted, reason) on the detail fields alone, or None if no rule rejects the job."""
+        years = job.get("years_experience")
+        if self.max_years is not None and years is not None and years > self.max_years:
+            return False, f"asks for {years}+ years of experience"
+        if self.posted_within_days is not None and job.get("posted"):
+            try:
+                posted = date.fromisoformat(job["posted"])
+            except ValueError:
+                posted = None
+            if posted and posted < date.today() - timedelta(days=self.posted_within_days):
+                return False, f"posted {posted.isoformat()}"
+        team = job.get("team")
+        if team:
+            if self.exclude_teams and (m := self.exclude_teams.search(team)):
+                return False, f"excluded team '{m.group(0)}'"
+            if self.require_teams and not self.require_teams.search(team):
+                return False, "team not in required set"
+        return None
+
+    def check(self, job):
+        """Returns (accepted, reason) for one job dict."""
+        title = job["title"]
+        if self.exclude and (m := self.exclude.search(title)):
+            return False, f"excluded title keyword '{m.group(0)}'"
+        if self.require and not self.require.search(title):
+            return False, "title has no required keyword"
+        if rejected := self.check_details(job):
+            return rejected
+
+        location = job.get("location") or ""
+        if self.exclude_locations and (m := self.exclude_locations.search(location)):
+            return False, f"excluded location '{m.group(0)}'"
+        if self.require_locations:
+            m = self.require_locations.search(location) or self.require_locations.search(job.get("url") or "")
+            if not m:
+                return False, "location not in required set"
+            return True, f"accepted (location '{m.group(0)}')"
+        return True, "accepted"
+
+    def evaluate(self, jobs):
+        """Checks a batch of job dicts in one pass; returns a list of (accepted, reason)."""
+        check = self.check
+        return [check(job) for job in jobs]
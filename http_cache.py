@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+
+
+# On-disk cache of GET responses that carry a validator (ETag / Last-Modified).
+# A cached URL is re-requested conditionally; a 304 is answered from disk, so an
+# unchanged API page costs a round trip but no download or parsing on the server's side.
+# The directory is kept between CI runs (see .github/workflows/scraper.yml).
+CACHE_DIR = os.path.join(".cache", "http")
+
+# Oldest entries (by last use) are evicted beyond this size.
+MAX_BYTES = 50 * 1024 * 1024
+
+
+def dir_size(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def is_warm(directory):
+    """True if `directory` holds anything from a previous run."""
+    return os.path.isdir(directory) and any(os.scandir(directory))
+
+
+class HttpCache:
+    """Validator-based response cache: one .json (status, headers) and one .body file per URL."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.warm = is_warm(directory)
+        self.revalidated = 0
+        self.stored = 0
+        self.saved_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        """The cached entry for `key` ({"status", "headers", "body"}), or None."""
+        path = self._path(key)
+        try:
+            with open(path + ".json", "r") as f:
+                entry = json.load(f)
+            with open(path + ".body", "rb") as f:
+                entry["body"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    @staticmethod
+    def validators(entry):
+        """Conditional request headers for a cached entry."""
+        headers = {}
+        if entry["headers"].get("etag"):
+            headers["If-None-Match"] = entry["headers"]["etag"]
+        if entry["headers"].get("last-modified"):
+            headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        return headers
+
+    def hit(self, key, entry):
+        """Records a 304 for `key` and marks the entry recently used."""
+        path = self._path(key)
+        for ext in (".json", ".body"):
+            try:
+                os.utime(path + ext)
+            except OSError:
+                pass
+        with self._lock:
+            self.revalidated += 1
+            self.saved_bytes += len(entry["body"])
+
+    def put(self, key, status, headers, body):
+        """Stores a response if it has a validator and may be stored. Returns True if cached."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        if not (headers.get("etag") or headers.get("last-modified")):
+            return False
+        if "no-store" in headers.get("cache-control", ""):
+            return False
+
+        path = self._path(key)
+        meta = {"key": key, "status": status, "headers": {
+            name: headers[name] for name in ("etag", "last-modified", "content-type") if name in headers
+        }}
+        # Per-process temp names: sharded workers share this directory
+        tmp = f".{os.getpid()}.tmp"
+        with open(path + ".body" + tmp, "wb") as f:
+            f.write(body)
+        with open(path + ".json" + tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".body" + tmp, path + ".body")
+        os.replace(path + ".json" + tmp, path + ".json")
+        with self._lock:
+            self.stored += 1
+        return True
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes. Returns how many."""
+        entries = {}
+        for item in os.scandir(self.directory):
+            stem, _, ext = item.name.partition(".")
+            if ext in ("json", "body"):
+                try:
+                    stat = item.stat()
+                except OSError:  # removed by another worker meanwhile
+                    continue
+                size, used = entries.get(stem, (0, 0))
+                entries[stem] = (size + stat.st_size, max(used, stat.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        removed = 0
+        for stem, (size, _) in sorted(entries.items(), key=lambda kv: kv[1][1]):
+            if total <= self.max_bytes:
+                break
+            for ext in (".json", ".body"):
+                try:
+                    os.remove(os.path.join(self.directory, stem + ext))
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+    def report(self):
+        print(f"[*] HTTP cache ({'warm' if self.warm else 'cold'}): {self.revalidated} responses revalidated "
+              f"(304), {self.saved_bytes / 1024:.0f} KB not re-downloaded, {self.stored} stored")
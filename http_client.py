@@ -0,0 +1,232 @@
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from http_cache import HttpCache
+
+try:
+    # Optional: with httpx and h2 installed, API requests go over HTTP/2.
+    import h2  # noqa: F401
+    import httpx
+except ImportError:
+    httpx = None
+
+
+# --- CONFIGURATION ---
+DEFAULT_TIMEOUT = 15
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds; doubles every retry, plus jitter
+BACKOFF_MAX = 20
+POOL_SIZE = 16
+
+# Max requests per second per host. Hosts not listed get DEFAULT_RATE_LIMIT.
+HOST_RATE_LIMITS = {
+    "jobs.apple.com": 4,
+    "apply.careers.microsoft.com": 4,
+}
+DEFAULT_RATE_LIMIT = 5
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json",
+}
+
+TRANSPORT_ERRORS = (requests.RequestException,) + ((httpx.TransportError,) if httpx else ())
+
+
+class HttpError(Exception):
+    """Raised when a request still fails after all retries."""
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def summary(self):
+        if not self.latencies:
+            return f"{self.requests} requests, {self.retries} retries, {self.failures} failures"
+        ordered = sorted(self.latencies)
+        p50 = ordered[len(ordered) // 2]
+        return (f"{self.requests} requests, {self.retries} retries, {self.failures} failures, "
+                f"p50 {p50 * 1000:.0f} ms, max {ordered[-1] * 1000:.0f} ms")
+
+    def as_dict(self):
+        return {"requests": self.requests, "retries": self.retries, "failures": self.failures, "bytes": self.bytes}
+
+
+class HttpClient:
+    """Pooled, keep-alive HTTP client shared by the API scrapers.
+
+    Transient failures (connection errors, timeouts, 429 and 5xx) are retried with
+    exponential backoff and jitter, honoring Retry-After. Requests to each host are
+    spaced out to stay under HOST_RATE_LIMITS. GETs made with cache=True are
+    revalidated against `cache` (an HttpCache) and a 304 is answered from disk.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, rate_limits=None, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.rate_limits = dict(HOST_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+        if httpx is not None:
+            self._client = httpx.Client(
+                http2=True,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,  # as requests does by default
+                limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+            )
+        else:
+            self._client = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            self._client.mount("https://", adapter)
+            self._client.mount("http://", adapter)
+            self._client.headers.update(DEFAULT_HEADERS)
+
+    @property
+    def http2(self):
+        return httpx is not None
+
+    def _host_stats(self, host):
+        with self._lock:
+            return self.stats.setdefault(host, HostStats())
+
+    def _wait_for_slot(self, host):
+        interval = 1.0 / self.rate_limits.get(host, DEFAULT_RATE_LIMIT)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _backoff(self, attempt, response=None):
+        if response is not None and response.headers.get("Retry-After"):
+            try:
+                return min(BACKOFF_MAX, float(response.headers["Retry-After"]))
+            except ValueError:
+                pass
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+    def _replay(self, entry, response):
+        # The 304 says the cached body is still current; hand back a 200 built from it
+        if httpx is not None:
+            return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"],
+                                  request=response.request)
+        replay = requests.Response()
+        replay.status_code = entry["status"]
+        replay.headers.update(entry["headers"])
+        replay._content = entry["body"]
+        replay.url = response.url
+        replay.request = response.request
+        return replay
+
+    def request(self, method, url, cache=False, **kwargs):
+        if cache and self.cache is not None and method == "GET":
+            return self._cached_get(url, **kwargs)
+        with metrics.timer("http"):
+            return self._request(method, url, **kwargs)
+
+    def _request(self, method, url, **kwargs):
+        host = urlparse(url).hostname
+        stats = self._host_stats(host)
+        kwargs.setdefault("timeout", self.timeout)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._lock:
+                    stats.retries += 1
+            self._wait_for_slot(host)
+            start = time.perf_counter()
+            response = None
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except TRANSPORT_ERRORS as e:
+                last_error = e
+            finally:
+                # The counters are shared by every thread requesting this host
+                with self._lock:
+                    stats.requests += 1
+                    stats.latencies.append(time.perf_counter() - start)
+
+            if response is not None:
+                size = len(response.content)
+                with self._lock:
+                    stats.bytes += size
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                last_error = f"HTTP {response.status_code}"
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, response))
+
+        with self._lock:
+            stats.failures += 1
+        raise HttpError(f"{method} {url} failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def _cached_get(self, url, **kwargs):
+        params = kwargs.get("params") or {}
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        entry = self.cache.get(key)
+        if entry is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **HttpCache.validators(entry)}
+
+        response = self.request("GET", url, **kwargs)
+        if entry is not None and response.status_code == 304:
+            self.cache.hit(key, entry)
+            return self._replay(entry, response)
+        if response.status_code == 200:
+            self.cache.put(key, response.status_code, response.headers, response.content)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def reset_stats(self):
+        """Starts new per-host stats (each poll cycle of the daemon) and returns the old ones."""
+        with self._lock:
+            stats, self.stats = self.stats, {}
+        return stats
+
+    def report(self):
+        for host, stats in sorted(self.stats.items()):
+            print(f"[*] HTTP {host}: {stats.summary()}")
+        if self.cache is not None:
+            self.cache.report()
+
+    def close(self):
+        self._client.close()
+        if self.cache is not None:
+            self.cache.evict()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client, so every scraper shares one connection pool."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpClient(cache=HttpCache())
+        return _shared
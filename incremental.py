@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from canonical import native_id
+from http_client import HttpError
+from locking import locked
+
+
+# Per source/query crawl state, so hourly runs only look at what changed:
+#   probe       - cheap fingerprint of the source (result count + first ID, ETag, page hash)
+#   newest_id   - high-water mark: the newest posting seen on the last full crawl
+#   full_crawl  - when the source was last crawled rather than skipped
+#   sweep       - when the source was last crawled to the end (see SWEEP_EVERY_DAYS)
+STATE_FILE = "crawl_state.json"
+
+# Stop paging after this many consecutive postings that were already known before this run.
+KNOWN_RUN_LIMIT = 5
+
+# Never skip a source for longer than this, in case a probe misses a change.
+FULL_CRAWL_EVERY_HOURS = 6
+
+# Incremental crawls stop where they catch up, so older postings that are still up
+# are never seen again. This often each source is swept instead: no probe skip and
+# no early stop (up to max_pages), so every live posting is sighted and kept from
+# expiring in the seen log. Must stay well under watcher.SEEN_JOBS_MAX_AGE_DAYS.
+SWEEP_EVERY_DAYS = 30
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class CrawlState:
+    """High-water marks and probes per source key, e.g. "Apple|Software"."""
+
+    def __init__(self, path=STATE_FILE, shared=False):
+        self.path = path
+        # Several processes share the file: save() then only writes back the keys this one committed
+        self.shared = shared
+        self._sources = {}
+        self._pending = {}
+        self._committed = set()
+        self._lock = threading.Lock()
+        # Postings first seen at or after this moment were found by the current run
+        self.run_started = _now()
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._sources = json.load(f)
+            except (OSError, ValueError):
+                print(f"[!] Could not read {path}, doing full crawls this run.")
+
+    def new_run(self):
+        """Starts a new run on the same state (each poll cycle of the daemon)."""
+        self.run_started = _now()
+
+    def newest_id(self, key):
+        return self._sources.get(key, {}).get("newest_id")
+
+    def unchanged(self, key, probe):
+        """True if `probe` matches the last full crawl and that crawl is recent enough to trust.
+
+        The new probe is kept aside and only stored by commit(), so a crawl that
+        fails halfway is not mistaken for an up-to-date one next run.
+        """
+        with self._lock:
+            self._pending.setdefault(key, {})["probe"] = probe
+            stored = self._sources.get(key)
+        if not stored or stored.get("probe") != probe:
+            return False
+        last_full = datetime.fromisoformat(stored["full_crawl"])
+        return datetime.now(timezone.utc) - last_full < timedelta(hours=FULL_CRAWL_EVERY_HOURS)
+
+    def sweep_due(self, key):
+        """True if `key` hasn't been crawled to the end in SWEEP_EVERY_DAYS."""
+        last_sweep = self._sources.get(key, {}).get("sweep")
+        if not last_sweep:
+            return True
+        return datetime.now(timezone.utc) - datetime.fromisoformat(last_sweep) >= timedelta(days=SWEEP_EVERY_DAYS)
+
+    def commit(self, key, newest_id=None, swept=False):
+        """Records a successful full crawl of `key`; `swept` if it went to the end."""
+        with self._lock:
+            entry = self._sources.setdefault(key, {})
+            entry.update(self._pending.pop(key, {}))
+            if newest_id is not None:
+                entry["newest_id"] = newest_id
+            entry["full_crawl"] = _now()
+            if swept:
+                entry["sweep"] = entry["full_crawl"]
+            self._committed.add(key)
+
+    def probe_url(self, key, url, client):
+        """Cheap change check for a page without an API: conditional GET, then ETag or body hash.
+
+        Returns True if the page is unchanged (see unchanged()). Any error counts as changed.
+        """
+        stored = self._sources.get(key, {})
+        headers = {"Accept": "text/html"}
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+        try:
+            r = client.get(url, headers=headers)
+        except HttpError:
+            return False
+
+        if r.status_code == 304:
+            return self.unchanged(key, stored.get("probe"))
+        if r.status_code != 200:
+            return False
+
+        with self._lock:
+            pending = self._pending.setdefault(key, {})
+            pending["etag"] = r.headers.get("ETag")
+            pending["last_modified"] = r.headers.get("Last-Modified")
+        probe = r.headers.get("ETag") or hashlib.sha256(r.content).hexdigest()
+        return self.unchanged(key, probe)
+
+    def save(self):
+        with self._lock:
+            if not self.shared:
+                self._write(self._sources)
+                return
+            with locked(self.path):
+                on_disk = self._read(self.path)
+                on_disk.update({key: self._sources[key] for key in self._committed})
+                self._write(on_disk)
+
+    def merge_from(self, path):
+        """Takes each key's most recent full crawl from another state file (e.g. a shard's)."""
+        with self._lock:
+            for key, entry in self._read(path).items():
+                mine = self._sources.get(key)
+                if mine is None or entry.get("full_crawl", "") > mine.get("full_crawl", ""):
+                    self._sources[key] = entry
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, sources):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(sources, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class StopTracker:
+    """Tells a date-sorted crawl when it has caught up with previous runs.
+
+    Feed it each posting ID in sort order. It says stop on reaching the last
+    run's high-water mark, or after KNOWN_RUN_LIMIT consecutive postings that were
+    known before this run started (postings other queries found earlier in this
+    same run don't count, so overlapping queries don't cut each other short).
+    """
+
+    def __init__(self, seen_jobs, crawl_state, key, company, run_limit=KNOWN_RUN_LIMIT):
+        self.seen_jobs = seen_jobs
+        self.company = company
+        self.since = crawl_state.run_started
+        high_water_id = crawl_state.newest_id(key)
+        self.high_water_id = native_id(high_water_id) if high_water_id else None
+        self.run_limit = run_limit
+        self.known_run = 0
+
+    def caught_up(self, job_id):
+        if self.high_water_id and native_id(job_id) == self.high_water_id:
+            return True
+        if self.seen_jobs.known_before(self.company, job_id, self.since):
+            self.known_run += 1
+        else:
+            self.known_run = 0
+        return self.known_run >= self.run_limit
@@ -0,0 +1,81 @@
+from urllib.parse import urljoin
+
+import metrics
+from extract import extract_records
+from readiness import goto_and_wait, scroll_until_stable
+from scrapers import Scraper, register
+
+
+@register("link_page")
+class LinkPageScraper(Scraper):
+    """A careers page whose postings are plain links, read with Playwright.
+
+    Extra config: `link_selector` matches the posting links (default every link).
+    The link text is the title and the rest of its parent element's text is the
+    location.
+
+    A cheap HTTP probe can skip the browser when the postings haven't changed, but
+    only if the config says where they are: `probe_url` is the data feed the page
+    loads them from, or `probe = true` if the page's own HTML already has them. By
+    default there is no probe, since the initial HTML of a page that renders its
+    postings with JavaScript doesn't change when they do.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.link_selector = config.get("link_selector", "a")
+        self.probe_url = config.get("probe_url") or (self.url if config.get("probe") else None)
+
+    def submit_query(self, engine, ctx, query):
+        # A sweep (see incremental.py) always loads the page
+        sweep = ctx.crawl_state.sweep_due(self.state_key(query))
+        probe = (lambda: self.probe(ctx, query)) if self.probe_url and not sweep else None
+        engine.submit_page(self.name, self.scrape_page, ctx, query, probe=probe)
+
+    def probe(self, ctx, query):
+        """True if the postings are unchanged since the last crawl, so the browser can be skipped."""
+        if ctx.crawl_state.probe_url(self.state_key(query), self.probe_url, ctx.client):
+            print(f"    [-] {self.label(query)} unchanged since last run, skipping")
+            return True
+        return False
+
+    async def scrape_page(self, page, ctx, query):
+        self.log_start(query)
+        emitted = 0
+
+        try:
+            # Wait until posting links render (or the network settles) instead of a fixed sleep
+            ready = await goto_and_wait(page, self.url, selector=self.link_selector)
+            if not ready:
+                print(f"    [!] {self.name} page not ready in time, reading what has loaded")
+
+            # Keep scrolling while lazily loaded postings keep appearing
+            await scroll_until_stable(page, self.link_selector)
+
+            jobs = []
+            for link in await extract_records(page, self.link_selector):
+                title, href = link["text"], link["href"]
+                if not href or len(title) < 5:
+                    continue
+
+                location = " ".join(link["parent_text"].replace(title, "", 1).split())
+                jobs.append({
+                    "id": href,
+                    "title": title,
+                    "company": self.company,
+                    "location": location or "Unknown",
+                    "url": urljoin(self.url, href),
+                })
+            # Pages can hold unrelated links, so only record postings that pass the filters
+            emitted = await self.aemit(ctx, jobs, record_rejected=False)
+
+            # Only a page that fully loaded counts as a crawl the probe can be compared against;
+            # it read every posting, so it is also a sweep
+            if ready:
+                ctx.pipeline.commit(self, self.state_key(query), swept=True)
+
+        except Exception as e:
+            print(f"[!] {self.name} scrape error: {e}")
+            metrics.error(f"scrape error: {e}")
+
+        return emitted
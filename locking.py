@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, so run a single worker there
+    fcntl = None
+
+
+@contextmanager
+def locked(path):
+    """Holds an exclusive lock on `path` (via `path`.lock) across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
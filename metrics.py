@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from locking import locked
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, so peak RSS isn't recorded there
+    resource = None
+
+
+# Per-run instrumentation. Code anywhere in a run calls timer()/timed()/count()/
+# error(); the work is attributed to the source whose task is running (Engine sets
+# current_site, and threads started with asyncio.to_thread inherit it). At the end
+# watcher.py appends one JSON record per run to METRICS_FILE.
+#
+# `python metrics.py` summarizes the recorded runs (see main()).
+METRICS_FILE = "metrics.jsonl"
+
+# Errors kept per source in a record (the count is always exact)
+MAX_ERRORS = 10
+
+# Site key for work done outside any source task: notifications, saving the database
+RUN_SITE = "(run)"
+
+current_site = contextvars.ContextVar("current_site", default=None)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def peak_rss_mb():
+    """Peak RSS of this process (not the browser's) in MB, or None where it can't be read."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RunMetrics:
+    """Phase timings, counters and errors per source for one run. Thread-safe."""
+
+    def __init__(self):
+        self.started = _now()
+        self._start = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def _site(self, site):
+        return site or current_site.get() or RUN_SITE
+
+    def add_time(self, phase, seconds, site=None):
+        site = self._site(site)
+        with self._lock:
+            stats = self.phases.setdefault(site, {}).setdefault(phase, {"seconds": 0.0, "count": 0, "max": 0.0})
+            stats["seconds"] += seconds
+            stats["count"] += 1
+            stats["max"] = max(stats["max"], seconds)
+
+    @contextmanager
+    def timer(self, phase, site=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start, site)
+
+    def count(self, name, n=1, site=None):
+        site = self._site(site)
+        with self._lock:
+            counters = self.counters.setdefault(site, {})
+            counters[name] = counters.get(name, 0) + n
+
+    def error(self, message, site=None):
+        site = self._site(site)
+        self.count("errors", site=site)
+        with self._lock:
+            errors = self.errors.setdefault(site, [])
+            if len(errors) < MAX_ERRORS:
+                errors.append(str(message)[:300])
+
+    def record(self, durations=None, new_jobs=None, http=None, browser=None, shard=None):
+        """The run as one JSON-serializable dict."""
+        durations = durations or {}
+        new_jobs = new_jobs or {}
+        sites = set(durations) | set(new_jobs) | set(self.phases) | set(self.counters) | set(self.errors)
+        sites.discard(RUN_SITE)
+
+        def rounded(phases):
+            return {phase: {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+                    for phase, stats in phases.items()}
+
+        rss = peak_rss_mb()
+        with self._lock:
+            return {
+                "started": self.started,
+                "duration": round(time.perf_counter() - self._start, 2),
+                "peak_rss_mb": round(rss, 1) if rss is not None else None,
+                "new_jobs": sum(new_jobs.values()),
+                "sources": {
+                    site: {
+                        "duration": round(durations.get(site, 0.0), 2),
+                        "new_jobs": new_jobs.get(site, 0),
+                        "phases": rounded(self.phases.get(site, {})),
+                        "counters": dict(self.counters.get(site, {})),
+                        "errors": list(self.errors.get(site, [])),
+                    }
+                    for site in sorted(sites)
+                },
+                "run_phases": rounded(self.phases.get(RUN_SITE, {})),
+                "http": http or {},
+                "browser": browser or {},
+                "shard": shard,
+            }
+
+    def append(self, path=METRICS_FILE, **kwargs):
+        record = self.record(**kwargs)
+        with locked(path), open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+        return record
+
+
+_current = RunMetrics()
+
+
+def get_metrics():
+    return _current
+
+
+def reset():
+    """Starts a fresh record (one per run)."""
+    global _current
+    _current = RunMetrics()
+    return _current
+
+
+def timer(phase, site=None):
+    return _current.timer(phase, site)
+
+
+def count(name, n=1, site=None):
+    _current.count(name, n, site)
+
+
+def error(message, site=None):
+    _current.error(message, site)
+
+
+def timed(phase):
+    """Decorator form of timer() for plain and async functions."""
+    def wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timer(phase):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+# --- Summary CLI ---
+
+def load(path=METRICS_FILE):
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def _median(values):
+    return statistics.median(values) if values else 0.0
+
+
+def _trend(recent, earlier):
+    if not earlier or not recent:
+        return ""
+    before, now = _median(earlier), _median(recent)
+    if before == 0:
+        return ""
+    return f" ({(now - before) / before:+.0%} vs previous)"
+
+
+def summarize(records, last):
+    recent, earlier = records[-last:], records[-2 * last:-last]
+    durations = [r["duration"] for r in recent]
+    print(f"[*] {len(records)} runs recorded; last {len(recent)} since {recent[0]['started']}")
+    print(f"[*] Run time: median {_median(durations):.1f}s, max {max(durations):.1f}s"
+          f"{_trend(durations, [r['duration'] for r in earlier])}; "
+          f"peak RSS max {max(r.get('peak_rss_mb') or 0 for r in recent):.0f} MB")
+
+    sites = sorted({site for r in recent for site in r["sources"]})
+    for site in sites:
+        runs = [r["sources"][site] for r in recent if site in r["sources"]]
+        before = [r["sources"][site]["duration"] for r in earlier if site in r["sources"]]
+        seconds = [s["duration"] for s in runs]
+        errors = sum(s["counters"].get("errors", 0) for s in runs)
+        scanned = sum(s["counters"].get("scanned", 0) for s in runs)
+        rejected = sum(s["counters"].get("rejected", 0) for s in runs)
+        print(f"    {site}: median {_median(seconds):.1f}s{_trend(seconds, before)}, "
+              f"{sum(s['new_jobs'] for s in runs)} new jobs, {scanned} scanned, {rejected} filtered out, "
+              f"{errors} errors")
+
+    # Where the time goes: each phase's median total per run, summed over sources
+    totals = {}
+    for r in recent:
+        per_run = {}
+        for phases in [s["phases"] for s in r["sources"].values()] + [r.get("run_phases", {})]:
+            for phase, stats in phases.items():
+                per_run[phase] = per_run.get(phase, 0.0) + stats["seconds"]
+        for phase, seconds in per_run.items():
+            totals.setdefault(phase, []).append(seconds)
+    if totals:
+        breakdown = ", ".join(f"{phase} {_median(values):.1f}s"
+                              for phase, values in sorted(totals.items(), key=lambda kv: -_median(kv[1])))
+        print(f"[*] Median time per run by phase: {breakdown}")
+
+    retries = sum(host.get("retries", 0) for r in recent for host in r.get("http", {}).values())
+    http_kb = sum(host.get("bytes", 0) for r in recent for host in r.get("http", {}).values()) / 1024
+    browser_kb = sum(r.get("browser", {}).get("loaded_bytes", 0) for r in recent) / 1024
+    print(f"[*] HTTP retries {retries}, {http_kb / len(recent):.0f} KB/run over HTTP, "
+          f"{browser_kb / len(recent):.0f} KB/run in the browser")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize recorded run metrics.")
+    parser.add_argument("--file", default=METRICS_FILE)
+    parser.add_argument("--last", type=int, default=24, help="runs to summarize (compared with the runs before them)")
+    args = parser.parse_args()
+
+    try:
+        records = load(args.file)
+    except OSError as e:
+        print(f"[!] Can't read {args.file}: {e}")
+        return 1
+    if not records:
+        print(f"[-] No runs recorded in {args.file}")
+        return 0
+    summarize(records, args.last)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import json
+from urllib.parse import urlparse, parse_qsl
+
+from enrichment import html_to_text, parse_years, posted_date
+from http_client import HttpError, get_client
+
+
+# apply.careers.microsoft.com is an Eightfold site; the SPA loads its listings from this endpoint.
+JOBS_API_URL = "https://apply.careers.microsoft.com/api/apply/v2/jobs"
+PAGE_SIZE = 10
+
+# Careers-page parameters the API understands (pid, filter_profession, filter_seniority, ...)
+# Anything else in the page URL (hl, start, ...) is dropped.
+FORWARDED_PARAMS = {"domain", "location", "pid", "sort_by", "filter_include_remote", "filter_profession", "filter_seniority"}
+
+
+class MicrosoftApiError(Exception):
+    """Raised when the jobs API can't be used, so callers can fall back to the browser."""
+
+
+def job_id_for(position_id):
+    # Same shape as the href the careers page links to, so IDs stay compatible with the seen store.
+    return f"/careers/job/{position_id}?domain=microsoft.com&hl=en"
+
+
+def _to_job(position):
+    position_id = position.get("id")
+    return {
+        "id": job_id_for(position_id),
+        "title": (position.get("name") or "N/A").strip(),
+        "company": "Microsoft",
+        "location": position.get("location") or "United States",
+        "url": position.get("canonicalPositionUrl") or f"https://apply.careers.microsoft.com{job_id_for(position_id)}",
+    }
+
+
+def details_url(position_id):
+    return f"{JOBS_API_URL}/{position_id}?domain=microsoft.com"
+
+
+def parse_details(body):
+    """Detail fields (see enrichment.py) from one position's JSON."""
+    position = json.loads(body)
+    locations = position.get("locations") or [position.get("location")]
+    return {
+        "location": "; ".join(location for location in locations if location) or None,
+        "posted": posted_date(position.get("t_create")),
+        "years_experience": parse_years(html_to_text(position.get("job_description"))),
+        "team": position.get("department") or None,
+    }
+
+
+def search_pages(careers_url, max_pages=10, client=None):
+    """Yields (jobs, total_count) per page of results for the filters in `careers_url`.
+
+    The caller decides when to stop (e.g. once a whole page is already seen);
+    iteration also ends on a short page or after `max_pages`.
+    """
+    params = {k: v for k, v in parse_qsl(urlparse(careers_url).query) if k in FORWARDED_PARAMS}
+    client = client or get_client()
+
+    for page_number in range(max_pages):
+        params["start"] = page_number * PAGE_SIZE
+        params["num"] = PAGE_SIZE
+        try:
+            r = client.get(JOBS_API_URL, params=params, cache=True)
+            if r.status_code != 200:
+                raise MicrosoftApiError(f"Jobs API returned HTTP {r.status_code} at start={params['start']}")
+            data = r.json()
+        except (HttpError, ValueError) as e:
+            raise MicrosoftApiError(f"Jobs API failed at start={params['start']}: {e}") from e
+
+        if "positions" not in data:
+            raise MicrosoftApiError(f"Unexpected response at start={params['start']}: {list(data)[:5]}")
+        positions = data["positions"] or []
+        yield [_to_job(p) for p in positions if p.get("id")], data.get("count", 0)
+
+        if len(positions) < PAGE_SIZE or params["start"] + PAGE_SIZE >= data.get("count", 0):
+            return
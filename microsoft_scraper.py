@@ -0,0 +1,55 @@
+import metrics
+import microsoft_api
+from canonical import native_id
+from extract import extract_records
+from scrapers import Scraper, register
+
+
+@register("microsoft")
+class MicrosoftScraper(Scraper):
+    """Microsoft Careers: the Eightfold JSON API, with the rendered careers page as fallback.
+
+    `url` is the careers-page search URL; its pid / filter_* parameters drive both paths.
+    """
+
+    def detail_request(self, job):
+        return microsoft_api.details_url(native_id(job["id"])), None, microsoft_api.parse_details
+
+    def submit_query(self, engine, ctx, query):
+        engine.submit_http(self.name, self.scrape_api, ctx, query, fallback=self.scrape_page)
+
+    def scrape_api(self, ctx, query):
+        """Raises microsoft_api.MicrosoftApiError so the engine can fall back to scrape_page."""
+        self.log_start(query, " API")
+        pages = microsoft_api.search_pages(self.url, max_pages=self.max_pages, client=ctx.client)
+        return self.emit_all(ctx, self.crawl_sorted(ctx, query, pages))
+
+    async def scrape_page(self, page, ctx, query):
+        self.log_start(query)
+        emitted = 0
+        try:
+            with metrics.timer("goto"):
+                await page.goto(self.url, timeout=60000)
+            with metrics.timer("wait"):
+                await page.wait_for_selector('div[data-test-id="job-listing"]', timeout=15000)
+
+            job_cards = await extract_records(page, 'div[data-test-id="job-listing"]', 'a')
+            jobs = []
+            for card in job_cards[:15]:
+                relative_link = card["href"]
+                if not relative_link: continue
+
+                lines = [line.strip() for line in card["text"].split('\n') if line.strip()]
+                jobs.append({
+                    "id": relative_link,
+                    "title": lines[0] if lines else 'N/A',
+                    "company": self.company,
+                    "location": "United States",
+                    "url": f"https://apply.careers.microsoft.com{relative_link}"
+                })
+            emitted = await self.aemit(ctx, jobs)
+        except Exception as e:
+            print(f"[!] {self.name} scrape error: {e}")
+            metrics.error(f"scrape error: {e}")
+
+        return emitted
@@ -0,0 +1,323 @@
+import json
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+import requests
+
+import metrics
+from locking import locked
+
+
+# --- CONFIGURATION ---
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+EMAIL_FROM = "namandalsania12@gmail.com"
+EMAIL_TO = "namandalsania12@gmail.com"  # Send to yourself
+
+DISCORD_MAX_EMBEDS = 10  # Discord's limit per message
+MAX_RETRIES = 4
+HTTP_TIMEOUT = 10
+FLUSH_INTERVAL = 30  # seconds between background drains
+MAX_SEND_ATTEMPTS = 5  # flushes an unsent job gets before it is dead-lettered
+RETRY_DELAY = 120  # seconds before a running notifier retries a job, doubling per attempt
+RETRY_DELAY_MAX = 3600
+
+# Results of one Discord post
+SENT, FAILED, REJECTED = "sent", "failed", "rejected"
+
+
+class Notifier:
+    """Collects new jobs from the scrapers and sends them in batches.
+
+    Scrapers only call push(), which never blocks on the network. flush() sends
+    everything queued so far as one digest email (over a single SMTP session that
+    is kept open between flushes) and as few Discord messages as the 10-embed
+    limit allows. start() drains in a background thread; close() does a final flush.
+
+    With an `outbox_path`, every pushed job is written there first, so jobs queued
+    when a run dies are still sent by the next one (see pending() and resend()).
+    The outbox records which channels have sent each job: a job is only re-sent
+    on the channels that haven't, and leaves the outbox once both have. A job that
+    failed is retried by a later flush of this notifier, with backoff, and by the
+    next run if this one ends first. A job a channel rejects outright (a 4xx, e.g.
+    a deleted webhook) or that is still unsent after MAX_SEND_ATTEMPTS flushes
+    moves to `dead_letter_path` instead.
+    """
+
+    def __init__(self, webhook_url=None, email_user=None, email_pass=None, outbox_path=None,
+                 dead_letter_path=None):
+        self.webhook_url = webhook_url
+        self.email_user = email_user
+        self.email_pass = email_pass
+        self.outbox_path = outbox_path
+        self.dead_letter_path = dead_letter_path
+        self._outbox_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._retry = []  # (monotonic time it is due, job) for jobs a flush couldn't send
+        self._http = requests.Session()
+        self._smtp = None
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if not self.email_user or not self.email_pass:
+            print("[!] Email credentials missing.")
+
+    def push(self, job):
+        if self.outbox_path:
+            with self._outbox_lock, locked(self.outbox_path), open(self.outbox_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(job) + "\n")
+        self._queue.put(job)
+
+    def pending(self):
+        """Jobs an earlier run put in the outbox but never got sent."""
+        if not self.outbox_path or not os.path.exists(self.outbox_path):
+            return []
+        jobs = []
+        with open(self.outbox_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    jobs.append(json.loads(line))
+                except ValueError:
+                    continue
+        return jobs
+
+    def resend(self, jobs):
+        """Queues jobs that are already in the outbox."""
+        for job in jobs:
+            self._queue.put(job)
+
+    def _channels(self):
+        channels = set()
+        if self.email_user and self.email_pass:
+            channels.add("email")
+        if self.webhook_url:
+            channels.add("discord")
+        return channels
+
+    def _settle(self, jobs, rejected):
+        """Records a flush of `jobs`: fully sent jobs leave the outbox, given-up ones
+        move to the dead-letter file, the rest are kept with their progress.
+        Returns the kept ones."""
+        channels = self._channels()
+        done, dead, kept = set(), [], {}
+        for job in jobs:
+            key = (job["company"], job["id"])
+            if channels <= set(job["_sent"]):
+                done.add(key)
+                continue
+            job["_attempts"] = job.get("_attempts", 0) + 1
+            if key in rejected or job["_attempts"] >= MAX_SEND_ATTEMPTS:
+                dead.append(job)
+                done.add(key)
+            else:
+                kept[key] = job
+
+        if self.outbox_path:
+            # Other processes' entries are left alone
+            with self._outbox_lock, locked(self.outbox_path):
+                entries = []
+                for entry in self.pending():
+                    key = (entry.get("company"), entry.get("id"))
+                    if key not in done:
+                        entries.append(kept.get(key, entry))
+                tmp_path = f"{self.outbox_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in entries)
+                os.replace(tmp_path, self.outbox_path)
+
+        if dead:
+            print(f"[!] Gave up on {len(dead)} jobs, moved to {self.dead_letter_path or 'nowhere (dropped)'}")
+            if self.dead_letter_path:
+                with locked(self.dead_letter_path), open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(job) + "\n" for job in dead)
+        if kept:
+            print(f"[!] {len(kept)} jobs not sent yet, will retry")
+        return list(kept.values())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._drain_loop, name="notifier", daemon=True)
+        self._thread.start()
+
+    def _drain_loop(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+        if self._smtp:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            self._smtp = None
+        self._http.close()
+
+    def flush(self):
+        """Sends every queued job on the channels that haven't sent it yet. Returns how many jobs were flushed."""
+        with self._flush_lock:
+            now = time.monotonic()
+            jobs = [job for due, job in self._retry if due <= now]
+            self._retry = [(due, job) for due, job in self._retry if due > now]
+            while True:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not jobs:
+                return 0
+            for job in jobs:
+                job.setdefault("_sent", [])
+            rejected = set()
+            email_jobs = [job for job in jobs if "email" not in job["_sent"]]
+            if email_jobs and self._send_email(email_jobs):
+                for job in email_jobs:
+                    job["_sent"].append("email")
+            discord_jobs = [job for job in jobs if "discord" not in job["_sent"]]
+            if discord_jobs:
+                sent, failed_for_good = self._send_discord(discord_jobs)
+                for job in sent:
+                    job["_sent"].append("discord")
+                rejected.update((job["company"], job["id"]) for job in failed_for_good)
+            for job in self._settle(jobs, rejected):
+                # Retried by a later flush while this notifier runs; the outbox covers the rest
+                delay = min(RETRY_DELAY_MAX, RETRY_DELAY * 2 ** (job["_attempts"] - 1))
+                self._retry.append((now + delay, job))
+            return len(jobs)
+
+    # --- Email ---
+
+    def _smtp_session(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._smtp = None
+        smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=HTTP_TIMEOUT)
+        smtp.login(self.email_user, self.email_pass)
+        self._smtp = smtp
+        return smtp
+
+    @metrics.timed("notify_email")
+    def _send_email(self, jobs):
+        """Returns True if the email was sent."""
+        if not self.email_user or not self.email_pass:
+            return False
+
+        msg = EmailMessage()
+        if len(jobs) == 1:
+            msg['Subject'] = f"New Job: {jobs[0]['title']} ({jobs[0]['company']})"
+        else:
+            companies = ", ".join(sorted({job['company'] for job in jobs}))
+            msg['Subject'] = f"{len(jobs)} New Jobs ({companies})"
+        msg['From'] = EMAIL_FROM
+        msg['To'] = EMAIL_TO
+        msg.set_content("\n\n".join(
+            f"Title: {job['title']}\n"
+            f"Company: {job['company']}\n"
+            f"Location: {job['location']}\n"
+            f"{_detail_lines(job)}"
+            f"Apply Here: {job['url']}"
+            for job in jobs
+        ))
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                self._smtp_session().send_message(msg)
+                print(f"[-] Digest email sent for {len(jobs)} jobs")
+                return True
+            except (smtplib.SMTPException, OSError) as e:
+                self._smtp = None
+                print(f"[!] Email failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
+                time.sleep(_backoff(attempt))
+        return False
+
+    # --- Discord ---
+
+    @metrics.timed("notify_discord")
+    def _send_discord(self, jobs):
+        """Returns (jobs sent, jobs Discord rejected outright). Nothing is sent without a webhook."""
+        if not self.webhook_url:
+            return [], []
+
+        sent, rejected = [], []
+        for i in range(0, len(jobs), DISCORD_MAX_EMBEDS):
+            batch = jobs[i:i + DISCORD_MAX_EMBEDS]
+            data = {
+                "content": f"🚨 **{len(batch)} NEW JOB{'S' if len(batch) > 1 else ''} DETECTED!** 🚨",
+                "embeds": [
+                    {
+                        "title": job['title'][:256],
+                        "url": job['url'],
+                        "description": f"Company: {job['company']}\nLocation: {job['location']}\n"
+                                       f"{_detail_lines(job)}[Apply Now]({job['url']})",
+                    }
+                    for job in batch
+                ],
+            }
+            status = self._post_discord(data)
+            if status == SENT:
+                print(f"[-] Discord notification sent for {len(batch)} jobs")
+                sent.extend(batch)
+            elif status == REJECTED:
+                rejected.extend(batch)
+        return sent, rejected
+
+    def _post_discord(self, data):
+        """SENT, FAILED (worth retrying later) or REJECTED (a 4xx: retrying won't help)."""
+        for attempt in range(MAX_RETRIES):
+            try:
+                r = self._http.post(self.webhook_url, json=data, timeout=HTTP_TIMEOUT)
+            except requests.RequestException as e:
+                print(f"[!] Discord request failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
+                time.sleep(_backoff(attempt))
+                continue
+
+            if r.status_code == 429:
+                # Discord says exactly how long to wait, in seconds
+                try:
+                    retry_after = float(r.json().get("retry_after", 1))
+                except ValueError:
+                    retry_after = float(r.headers.get("Retry-After", 1))
+                print(f"[!] Discord rate limited, retrying in {retry_after:.1f}s")
+                time.sleep(retry_after)
+                continue
+            if r.status_code >= 500:
+                print(f"[!] Discord returned {r.status_code} (attempt {attempt + 1}/{MAX_RETRIES})")
+                time.sleep(_backoff(attempt))
+                continue
+            if r.status_code >= 400:
+                print(f"[!] Discord rejected message: {r.status_code} {r.text[:200]}")
+                return REJECTED
+            return SENT
+
+        print("[!] Failed to send Discord notification after retries")
+        return FAILED
+
+
+def _detail_lines(job):
+    # Fields only sources with enrichment have (see enrichment.py)
+    lines = []
+    if job.get("team"):
+        lines.append(f"Team: {job['team']}")
+    if job.get("years_experience") is not None:
+        lines.append(f"Experience: {job['years_experience']}+ years")
+    if job.get("posted"):
+        lines.append(f"Posted: {job['posted']}")
+    return "".join(line + "\n" for line in lines)
+
+
+def _backoff(attempt):
+    # No point waiting after the last attempt
+    if attempt == MAX_RETRIES - 1:
+        return 0
+    return min(30, 2 ** attempt) + random.uniform(0, 1)
@@ -0,0 +1,211 @@
+import asyncio
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+
+import metrics
+from canonical import fingerprint, job_key
+
+
+# Jobs flow from the scrapers to the alerts and the seen log through stages:
+#
+#   extract (scraper tasks) -> normalize -> filter -> dedup -> [enrich] -> notify -> persist
+#
+# The enrich stage only runs for sources with `enrich = true` and only on new
+# postings that passed the filters; the filters then run again on the details.
+#
+# Scrapers hand over batches (an API page, a rendered page) through a bounded
+# queue and block while it is full, so a slow stage holds extraction back
+# instead of letting batches pile up in memory. One consumer thread runs the
+# other stages, which makes it the only writer of the seen store.
+#
+# Checkpoints: new seen IDs are saved after every batch, and a query's high-water
+# mark is saved only once all of its batches have been. A run that dies part way
+# is picked up by the next one from there; alerts it queued but never sent are
+# still in the notifier's outbox and are sent on start().
+
+# Batches waiting for the consumer before scrapers block
+QUEUE_BATCHES = 8
+
+# Longer lists are split into batches of this many jobs
+BATCH_SIZE = 50
+
+_STOP = object()
+
+
+def normalize(job, company):
+    """Trims the scraped text fields and fills in the ones a scraper left empty."""
+    job["id"] = str(job["id"]).strip()
+    job["title"] = " ".join(str(job.get("title") or "").split()) or "N/A"
+    job["location"] = " ".join(str(job.get("location") or "").split()) or "Unknown"
+    job["url"] = str(job.get("url") or "").strip()
+    job["company"] = company
+    return job
+
+
+class Pipeline:
+    """Filters, dedups, alerts on and persists the batches scrapers emit.
+
+    `counts` holds the alerts queued per source since the last take_counts().
+    """
+
+    def __init__(self, seen_jobs, notifier, crawl_state, enricher=None, maxsize=QUEUE_BATCHES):
+        self.seen_jobs = seen_jobs
+        self.notifier = notifier
+        self.crawl_state = crawl_state
+        self.enricher = enricher
+        self.counts = {}
+        self._failed = set()
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, companies=None):
+        """Starts the consumer. With `companies`, first re-sends their alerts left in the outbox."""
+        if companies is not None:
+            self.recover(companies)
+        self._thread = threading.Thread(target=self._consume, name="pipeline", daemon=True)
+        self._thread.start()
+
+    def recover(self, companies):
+        jobs = [job for job in self.notifier.pending() if job.get("company") in companies]
+        if not jobs:
+            return 0
+        for job in jobs:
+            # The run may have died before these IDs were saved
+            self.seen_jobs.add(job["company"], job["id"], fingerprint(job))
+        self.seen_jobs.save()
+        self.notifier.resend(jobs)
+        print(f"[*] Re-sending {len(jobs)} alerts queued by an earlier run that weren't sent")
+        return len(jobs)
+
+    def emit(self, scraper, jobs, record_rejected=True):
+        """Queues jobs from `scraper`, blocking while the queue is full. Returns how many."""
+        for i in range(0, len(jobs), BATCH_SIZE):
+            self._queue.put(("batch", scraper, jobs[i:i + BATCH_SIZE], record_rejected))
+        return len(jobs)
+
+    async def aemit(self, scraper, jobs, record_rejected=True):
+        """emit() for browser tasks: waits in a thread so the event loop keeps running."""
+        return await asyncio.to_thread(self.emit, scraper, jobs, record_rejected)
+
+    def commit(self, scraper, key, newest_id=None, swept=False):
+        """Queues a crawl state checkpoint, saved once the batches emitted before it are."""
+        self._queue.put(("commit", scraper, key, newest_id, swept))
+
+    def drain(self):
+        """Waits until everything queued so far has been processed."""
+        self._queue.join()
+
+    def take_counts(self):
+        """Alerts per source since the last call (or start); the daemon takes them every cycle."""
+        with self._lock:
+            counts, self.counts = self.counts, {}
+            self._failed = set()
+        return counts
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _consume(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                kind, scraper, *args = item
+                try:
+                    if kind == "batch":
+                        self._process(scraper, *args)
+                    elif scraper.name not in self._failed:
+                        self._checkpoint(scraper, *args)
+                except Exception as e:
+                    # Don't move the high-water mark past postings that weren't recorded
+                    self._failed.add(scraper.name)
+                    print(f"[!] {scraper.name} pipeline error: {e}")
+                    metrics.error(f"pipeline error: {e}", site=scraper.name)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, scraper, jobs, record_rejected):
+        """One batch through normalize, filter, dedup, enrich, notify and persist.
+
+        With `record_rejected`, postings the filters reject are recorded as seen too,
+        so incremental crawls can tell where they caught up. A new ID whose title and
+        location match a posting seen within the source's repost_window_days is
+        recorded without an alert.
+
+        New postings that may alert are only recorded as seen once their alerts are in
+        the outbox, so a batch that fails part way is found (and alerted) again next run.
+        """
+        site = scraper.name
+        jobs = [normalize(job, scraper.company) for job in jobs]
+        with metrics.timer("filter", site=site):
+            verdicts = scraper.job_filter.evaluate(jobs)
+        metrics.count("scanned", len(jobs), site=site)
+
+        since = (datetime.now(timezone.utc) - timedelta(days=scraper.repost_window_days)).isoformat(timespec="seconds")
+        candidates, new_jobs = [], []
+        batch_keys, batch_fingerprints = set(), {}
+        rejected = {}
+        for job, (accepted, reason) in zip(jobs, verdicts):
+            if not accepted:
+                rejected[reason] = rejected.get(reason, 0) + 1
+                if not record_rejected:
+                    continue
+            job_fingerprint = fingerprint(job)
+            repost = scraper.repost_window_days and (
+                self.seen_jobs.repost_of(scraper.company, job_fingerprint, since)
+                or batch_fingerprints.get(job_fingerprint))
+            key = job_key(scraper.company, job["id"])
+            if key in batch_keys or (scraper.company, job["id"]) in self.seen_jobs:
+                self.seen_jobs.add(scraper.company, job["id"])  # records the sighting
+                continue
+            batch_keys.add(key)
+            metrics.count("new_postings", site=site)
+            if not accepted or repost:
+                self.seen_jobs.add(scraper.company, job["id"], job_fingerprint)
+                if repost:
+                    print(f"    [-] Repost of {repost['id']}, not alerting: {job['title']} ({job['location']})")
+                    metrics.count("reposts", site=site)
+                continue
+            batch_fingerprints.setdefault(job_fingerprint, job)
+            new_jobs.append((job, job_fingerprint))
+            candidates.append(job)
+
+        if candidates and scraper.enrich and self.enricher is not None:
+            self.enricher.enrich(scraper, candidates)
+            # Check again now that the real location, experience and so on are known
+            accepted_jobs = []
+            for job, (accepted, reason) in zip(candidates, scraper.job_filter.evaluate(candidates)):
+                if accepted:
+                    accepted_jobs.append(job)
+                else:
+                    rejected[reason] = rejected.get(reason, 0) + 1
+            candidates = accepted_jobs
+
+        for job in candidates:
+            # push() writes the outbox before queueing, so the alert survives a crash from here on
+            self.notifier.push(job)
+            print(f"    [+] Found: {job['title']} ({job['location']})")
+        # Including the ones the details ruled out, so they aren't fetched again
+        for job, job_fingerprint in new_jobs:
+            self.seen_jobs.add(scraper.company, job["id"], job_fingerprint)
+
+        if rejected:
+            metrics.count("rejected", sum(rejected.values()), site=site)
+            reasons = ", ".join(f"{reason}: {n}" for reason, n in sorted(rejected.items(), key=lambda kv: -kv[1]))
+            print(f"    [-] {site}: {sum(rejected.values())} filtered out ({reasons})")
+
+        with metrics.timer("persist", site=site):
+            self.seen_jobs.save()
+        with self._lock:
+            self.counts[site] = self.counts.get(site, 0) + len(candidates)
+
+    def _checkpoint(self, scraper, key, newest_id, swept):
+        with metrics.timer("persist", site=scraper.name):
+            self.crawl_state.commit(key, newest_id, swept)
+            self.crawl_state.save()
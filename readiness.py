@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import metrics
+
+
+# Event-driven replacements for fixed page.wait_for_timeout() sleeps.
+# Every wait has a hard upper bound; hitting it is not an error, the scraper just
+# reads whatever has rendered by then.
+
+READY_TIMEOUT_MS = 10000
+POLL_INTERVAL_MS = 250
+STABLE_MS = 750
+
+
+async def wait_for_stable_count(page, selector, timeout=READY_TIMEOUT_MS, stable_ms=STABLE_MS, minimum=1):
+    """Waits until at least `minimum` elements match `selector` and the count stops changing.
+
+    Returns the stable count, or None if the timeout was hit first (too few matches,
+    or a count that kept changing).
+    """
+    deadline = time.monotonic() + timeout / 1000
+    locator = page.locator(selector)
+    last_count = -1
+    stable_since = time.monotonic()
+
+    while True:
+        count = await locator.count()
+        now = time.monotonic()
+        if count != last_count:
+            last_count = count
+            stable_since = now
+        elif count >= minimum and (now - stable_since) * 1000 >= stable_ms:
+            return count
+        if now >= deadline:
+            return None
+        await asyncio.sleep(POLL_INTERVAL_MS / 1000)
+
+
+async def _network_idle(page, timeout):
+    await page.wait_for_load_state("networkidle", timeout=timeout)
+    return True
+
+
+async def goto_and_wait(page, url, selector=None, response_url=None, network_idle=True,
+                        timeout=READY_TIMEOUT_MS, nav_timeout=60000):
+    """Navigates to `url` and returns as soon as any readiness signal fires:
+
+      - the page reaches network-idle (if `network_idle`),
+      - the number of `selector` matches is non-zero and stable,
+      - a response whose URL contains `response_url` arrives.
+
+    Returns the name of the signal that fired, or None if `timeout` ms passed first.
+    """
+    waiters = {}
+    if response_url:
+        # Armed before navigating so an early XHR isn't missed
+        waiters["response"] = asyncio.ensure_future(
+            page.wait_for_event("response", lambda r: response_url in r.url, timeout=nav_timeout + timeout)
+        )
+
+    try:
+        with metrics.timer("goto"):
+            await page.goto(url, timeout=nav_timeout)
+
+        if network_idle:
+            waiters["networkidle"] = asyncio.ensure_future(_network_idle(page, timeout))
+        if selector:
+            waiters["selector"] = asyncio.ensure_future(wait_for_stable_count(page, selector, timeout))
+
+        pending = set(waiters.values())
+        deadline = time.monotonic() + timeout / 1000
+        with metrics.timer("wait"):
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0, deadline - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    return None
+                for name, task in waiters.items():
+                    # A waiter that gave up (e.g. too few selector matches) isn't a signal
+                    if task in done and not task.exception() and task.result():
+                        return name
+            return None
+    finally:
+        for task in waiters.values():
+            task.cancel()
+        # Swallow the cancellations / timeouts of the losers
+        await asyncio.gather(*waiters.values(), return_exceptions=True)
+
+
+@metrics.timed("scroll")
+async def scroll_until_stable(page, selector, max_rounds=10, round_timeout=2000):
+    """Scrolls to the bottom repeatedly until no new `selector` matches appear.
+
+    Returns the final number of matches.
+    """
+    count = await page.locator(selector).count()
+    for _ in range(max_rounds):
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        new_count = await wait_for_stable_count(page, selector, timeout=round_timeout, minimum=count + 1)
+        if new_count is None:
+            # Nothing new, or still loading when the round ran out: keep what has rendered
+            new_count = await page.locator(selector).count()
+        if new_count <= count:
+            break
+        count = new_count
+    return count
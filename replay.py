@@ -0,0 +1,198 @@
+import base64
+import json
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+from http_client import HttpError
+
+
+# Record/replay of everything a run fetches, so scrapers can be benchmarked and
+# checked offline. API traffic is saved as request/response pairs in
+# fixtures/http.json; browser traffic as one HAR file per page task in fixtures/har/.
+# See bench_replay.py for the command line.
+FIXTURES_DIR = "fixtures"
+
+
+def request_key(method, url, params=None, json_body=None):
+    """Identifies a request independently of headers (tokens, validators) and ordering."""
+    query = json.dumps(sorted((params or {}).items()))
+    body = json.dumps(json_body, sort_keys=True) if json_body is not None else ""
+    return f"{method} {url} {query} {body}"
+
+
+def _slug(site):
+    return re.sub(r"[^a-z0-9]+", "-", (site or "page").lower()).strip("-")
+
+
+class _Headers(dict):
+    """Case-insensitive header lookup over lowercased keys."""
+
+    def __getitem__(self, name):
+        return super().__getitem__(name.lower())
+
+    def __contains__(self, name):
+        return super().__contains__(name.lower())
+
+    def get(self, name, default=None):
+        return super().get(name.lower(), default)
+
+
+class ReplayResponse:
+    """The parts of a requests/httpx response the scrapers use."""
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = _Headers({k.lower(): v for k, v in headers.items()})
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class RecordingClient:
+    """Wraps an HttpClient and keeps every exchange; save() merges them into the fixture file."""
+
+    def __init__(self, client, path=os.path.join(FIXTURES_DIR, "http.json")):
+        self.client = client
+        self.path = path
+        self._exchanges = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, url, cache=False, **kwargs):
+        # Never answer from the HTTP cache while recording: the fixture needs the full body
+        response = self.client.request(method, url, **kwargs)
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"))
+        try:
+            body = {"text": response.content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(response.content).decode("ascii")}
+        with self._lock:
+            self._exchanges[key] = {"status": response.status_code, "headers": dict(response.headers), **body}
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def report(self):
+        self.client.report()
+
+    def close(self):
+        self.client.close()
+
+    def save(self):
+        exchanges = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                exchanges = json.load(f)
+        exchanges.update(self._exchanges)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(exchanges, f, indent=1, sort_keys=True)
+        return len(self._exchanges)
+
+
+class ReplayClient:
+    """Serves recorded exchanges; anything not recorded fails like a dead network would."""
+
+    def __init__(self, path=os.path.join(FIXTURES_DIR, "http.json")):
+        with open(path, "r") as f:
+            self._exchanges = json.load(f)
+        self.requests = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, cache=False, **kwargs):
+        host = urlparse(url).hostname
+        with self._lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+        exchange = self._exchanges.get(request_key(method, url, kwargs.get("params"), kwargs.get("json")))
+        if exchange is None:
+            with self._lock:
+                self.misses += 1
+            raise HttpError(f"{method} {url} not in the recorded fixtures")
+        if "base64" in exchange:
+            content = base64.b64decode(exchange["base64"])
+        else:
+            content = exchange["text"].encode("utf-8")
+        return ReplayResponse(exchange["status"], exchange["headers"], content, url)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def report(self):
+        for host, count in sorted(self.requests.items()):
+            print(f"[*] Replayed HTTP {host}: {count} requests")
+        if self.misses:
+            print(f"[!] {self.misses} HTTP requests had no recording")
+
+    def close(self):
+        pass
+
+
+class HarStore:
+    """Records browser traffic to HAR files, or replays it with route_from_har.
+
+    Passed to Engine(har=...). In "record" mode every page task gets its own HAR
+    file and the usual blocking still applies, so recordings match a real run.
+    In "replay" mode requests missing from the site's HARs are aborted, so a
+    replay never touches the network.
+    """
+
+    def __init__(self, directory=os.path.join(FIXTURES_DIR, "har"), mode="replay"):
+        self.directory = directory
+        self.mode = mode
+        self.requests = {}
+        self._tasks = {}
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+
+    def context_options(self, site):
+        if self.mode != "record":
+            return {}
+        n = self._tasks[site] = self._tasks.get(site, 0) + 1
+        if n == 1:
+            # A new recording of this site replaces the old one
+            for path in self._har_files(site):
+                os.remove(path)
+        path = os.path.join(self.directory, f"{_slug(site)}-{n}.har")
+        return {"record_har_path": path, "record_har_content": "embed"}
+
+    def _har_files(self, site):
+        pattern = re.compile(re.escape(_slug(site)) + r"-\d+\.har$")
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if pattern.match(name)
+        )
+
+    async def install(self, context, site):
+        """Sets up `context`. Returns True if it replaces the usual request blocking."""
+        def on_request(request):
+            self.requests[site] = self.requests.get(site, 0) + 1
+        context.on("request", on_request)
+
+        if self.mode != "replay":
+            return False
+
+        async def offline(route):
+            await route.abort()
+
+        # Routes added later take priority: each HAR falls back to the next, then to the abort
+        await context.route("**/*", offline)
+        for path in self._har_files(site):
+            await context.route_from_har(path, not_found="fallback")
+        return True
@@ -0,0 +1,88 @@
+import random
+import time
+
+
+# Polling intervals for `watcher.py --daemon`, in minutes.
+# Each source is polled about as often as it gets new postings: the interval is
+# the expected time to one new posting, from a moving average of its posting rate,
+# kept between min_interval and max_interval (overridable per source in sources.toml).
+DEFAULT_INTERVAL = 30
+MIN_INTERVAL = 5
+MAX_INTERVAL = 120
+
+# Weight of the latest poll in the posting-rate average
+RATE_SMOOTHING = 0.3
+
+# Each interval is randomized by +/- this fraction so sources don't poll in lockstep
+JITTER = 0.1
+
+
+class SourceSchedule:
+    def __init__(self, name, interval, min_interval, max_interval):
+        self.name = name
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rate = None  # new postings per minute
+        self.failures = 0
+        self.base_interval = interval  # the interval before the current run of failures
+        self.last_poll = None
+        self.next_due = 0.0
+
+    def _clamp(self, minutes):
+        return max(self.min_interval, min(self.max_interval, minutes))
+
+    def update(self, new_postings, failed, now):
+        """Adjusts the interval after a poll. Returns it in minutes."""
+        if failed:
+            # Back off exponentially from the interval before the first failure
+            # (doubling the already backed-off one would compound); keep the rate estimate
+            if self.failures == 0:
+                self.base_interval = self.interval
+            self.failures += 1
+            self.interval = self._clamp(self.base_interval * 2 ** self.failures)
+        else:
+            if self.failures:
+                self.interval = self.base_interval
+            self.failures = 0
+            if self.last_poll is not None:
+                observed = new_postings / max((now - self.last_poll) / 60, 1e-3)
+                self.rate = observed if self.rate is None else (
+                    RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * self.rate)
+                self.interval = self._clamp(1 / self.rate if self.rate > 0 else self.max_interval)
+            self.last_poll = now
+
+        self.next_due = now + self.interval * 60 * random.uniform(1 - JITTER, 1 + JITTER)
+        return self.interval
+
+
+class PollScheduler:
+    """Decides which sources are due. Every source is due once at startup.
+
+    Per-source config keys (minutes): poll_interval (the starting interval),
+    min_interval, max_interval.
+    """
+
+    def __init__(self, sources, clock=time.monotonic):
+        self.clock = clock
+        self.sources = {source.name: source for source in sources}
+        self.schedules = {
+            source.name: SourceSchedule(
+                source.name,
+                source.config.get("poll_interval", DEFAULT_INTERVAL),
+                source.config.get("min_interval", MIN_INTERVAL),
+                source.config.get("max_interval", MAX_INTERVAL),
+            )
+            for source in sources
+        }
+
+    def due(self):
+        now = self.clock()
+        return [self.sources[name] for name, s in self.schedules.items() if s.next_due <= now]
+
+    def seconds_until_next(self):
+        return max(0.0, min(s.next_due for s in self.schedules.values()) - self.clock())
+
+    def record(self, source, new_postings, failed):
+        """Reschedules `source` after a poll. Returns its new interval in minutes."""
+        return self.schedules[source.name].update(new_postings, failed, self.clock())
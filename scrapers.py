@@ -0,0 +1,165 @@
+import importlib
+from datetime import datetime
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+import enrichment
+from canonical import REPOST_WINDOW_DAYS
+from filters import JobFilter
+from incremental import StopTracker
+
+
+# Every [[source]] in the config names one of these backends.
+REGISTRY = {}
+
+# Modules that register backends when imported
+PLUGIN_MODULES = ["microsoft_scraper", "apple_scraper", "link_page_scraper", "workday_scraper"]
+
+SOURCES_FILE = "sources.toml"
+
+
+def register(backend):
+    """Class decorator that makes a Scraper subclass available as `backend` in the config."""
+    def wrap(cls):
+        cls.backend = backend
+        REGISTRY[backend] = cls
+        return cls
+    return wrap
+
+
+class RunContext:
+    """State shared by every scraper task in a run."""
+
+    def __init__(self, seen_jobs, notifier, crawl_state, client, pipeline):
+        self.seen_jobs = seen_jobs
+        self.notifier = notifier
+        self.crawl_state = crawl_state
+        self.client = client
+        self.pipeline = pipeline
+
+
+class Scraper:
+    """One configured source. Subclasses implement submit_query().
+
+    Config keys every backend understands: name, company (defaults to name), url,
+    queries (each becomes its own task), max_pages, concurrency (tasks at once
+    for this source), filters, repost_window_days (default 0: alert on every new ID) and
+    enrich (fetch each new posting's details, see enrichment.py).
+    """
+
+    backend = None
+
+    def __init__(self, config):
+        self.name = config["name"]
+        self.company = config.get("company", self.name)
+        self.url = config.get("url")
+        self.queries = config.get("queries") or [None]
+        self.max_pages = config.get("max_pages", 5)
+        self.concurrency = config.get("concurrency", 1)
+        self.filters = config.get("filters", {})
+        self.job_filter = JobFilter(self.filters)
+        self.repost_window_days = config.get("repost_window_days", REPOST_WINDOW_DAYS)
+        self.enrich = config.get("enrich", False)
+        self.config = config
+
+    def submit(self, engine, ctx):
+        for query in self.queries:
+            self.submit_query(engine, ctx, query)
+
+    def submit_query(self, engine, ctx, query):
+        raise NotImplementedError
+
+    def label(self, query):
+        return f"{self.name} '{query}'" if query else self.name
+
+    def state_key(self, query):
+        return f"{self.name}|{query if query else self.url}"
+
+    def log_start(self, query, how=""):
+        print(f"[*] Checking {self.label(query)}{how}: {datetime.now().strftime('%H:%M:%S')}")
+
+    def detail_request(self, job):
+        """(url, headers, parse) for a posting's details: by default its page, read for a
+        schema.org JobPosting. Backends with a JSON detail endpoint override this."""
+        return job["url"], enrichment.HTML_HEADERS, enrichment.parse_html_details
+
+    def emit(self, ctx, jobs, record_rejected=True):
+        """Hands a batch of scraped jobs to the run's pipeline (see pipeline.py). Returns how many.
+
+        With `record_rejected`, postings the filters reject are recorded as seen too.
+        """
+        return ctx.pipeline.emit(self, jobs, record_rejected)
+
+    async def aemit(self, ctx, jobs, record_rejected=True):
+        return await ctx.pipeline.aemit(self, jobs, record_rejected)
+
+    def emit_all(self, ctx, batches):
+        """Emits every batch a generator yields as it comes. Returns the number of jobs."""
+        return sum(self.emit(ctx, jobs) for jobs in batches)
+
+    def crawl_sorted(self, ctx, query, pages):
+        """Incremental crawl of a newest-first API that yields (jobs, total) per page.
+
+        A generator of the batches of postings not seen in earlier runs. Skips the
+        query when the result count and newest posting match the last full crawl,
+        and otherwise stops paging once it has caught up; the high-water mark is
+        checkpointed after the last batch. When a sweep is due (see incremental.py)
+        it neither skips nor stops early, so every listed posting is sighted.
+        """
+        key = self.state_key(query)
+        stop = StopTracker(ctx.seen_jobs, ctx.crawl_state, key, self.company)
+        sweep = ctx.crawl_state.sweep_due(key)
+        newest_id = None
+
+        for page_number, (jobs, total) in enumerate(pages):
+            if page_number == 0:
+                newest_id = jobs[0]["id"] if jobs else None
+                if ctx.crawl_state.unchanged(key, f"{total}:{newest_id}") and not sweep:
+                    print(f"    [-] {self.label(query)} unchanged since last run, skipping")
+                    return
+
+            fresh = []
+            for job in jobs:
+                if not sweep and stop.caught_up(job["id"]):
+                    break
+                fresh.append(job)
+            if fresh:
+                yield fresh
+            if len(fresh) < len(jobs):
+                break
+
+        ctx.pipeline.commit(self, key, newest_id, swept=sweep)
+
+
+def _expand(values, keywords):
+    expanded = []
+    for value in values:
+        if value.startswith("@"):
+            expanded.extend(keywords[value[1:]])
+        else:
+            expanded.append(value)
+    return [v.lower() for v in expanded]
+
+
+def load_sources(path=SOURCES_FILE):
+    """Reads the source config and returns one Scraper per [[source]]."""
+    for module in PLUGIN_MODULES:
+        importlib.import_module(module)
+
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    keywords = config.get("keywords", {})
+    scrapers = []
+    for source in config.get("source", []):
+        backend = source.get("backend")
+        if backend not in REGISTRY:
+            raise ValueError(f"Source '{source.get('name')}' has unknown backend '{backend}' (known: {sorted(REGISTRY)})")
+        source = dict(source)
+        source["filters"] = {key: _expand(values, keywords) if isinstance(values, list) else values
+                             for key, values in source.get("filters", {}).items()}
+        scrapers.append(REGISTRY[backend](source))
+    return scrapers
@@ -0,0 +1,261 @@
+import json
+import os
+import re
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+from canonical import job_key
+from locking import locked
+
+
+# Append-only log: one JSON object per line, {"id", "company", "first_seen", "last_seen", "fingerprint"}.
+# "id" is the canonical native ID (see canonical.py) and (company, id) is the key.
+# New IDs are written when first seen; an ID that is seen again is re-appended
+# with a new "last_seen" at most every SIGHTING_REFRESH_DAYS, so the file (and its
+# git diff) grows by a few lines per run instead of being rewritten. The last
+# line for a key wins for last_seen; first_seen is the earliest of them.
+SEEN_LOG = "seen_jobs.jsonl"
+
+# How stale an entry's last_seen may get before a sighting re-appends it. Incremental
+# crawls stop early, so postings past the stop point are only sighted by the periodic
+# sweep (incremental.SWEEP_EVERY_DAYS); this plus that must stay under the expiry
+# age, or live postings would expire between refreshes.
+SIGHTING_REFRESH_DAYS = 60
+
+# The old format: a flat JSON list of IDs. Imported once if the log doesn't exist yet.
+LEGACY_DB = "seen_jobs.json"
+
+
+def guess_company(job_id):
+    """Best-effort company for IDs imported from the legacy list, which didn't record it."""
+    if job_id.startswith("/careers/job/"):
+        return "Microsoft"
+    if "microsoft.ai" in job_id:
+        return "Microsoft AI"
+    if job_id.startswith("JR"):
+        return "NVIDIA"
+    if re.match(r"^\d+(-\d+)?$", job_id):
+        return "Apple"
+    return "Unknown"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _last_seen(entry):
+    # Entries written before sightings were tracked only have first_seen
+    return entry.get("last_seen", entry["first_seen"])
+
+
+class SeenStore:
+    """Set of seen (company, native_id) keys with O(1) membership, backed by an append-only log.
+
+    Methods take a company and any raw ID a scraper produced; IDs are canonicalized here.
+    expire() goes by the last sighting, so postings that stay up are never forgotten.
+
+    With `shared`, several processes can use the same log: add() takes a file lock,
+    reads what the others appended since, and writes the new entry straight away,
+    so only one process gets True for a key. (Shard runs split the sources by company,
+    so they never race to alert the same job.)
+    """
+
+    def __init__(self, path=SEEN_LOG, legacy_path=LEGACY_DB, shared=False):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.shared = shared
+        self._entries = {}
+        self._fingerprints = {}
+        self._pending = []
+        self._offset = 0
+        self._superseded = 0  # log lines a later line for the same key replaced
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            self._load()
+        elif legacy_path and os.path.exists(legacy_path):
+            self._migrate()
+
+    def _read_entries(self, path, offset=0):
+        """Entries in `path` from byte `offset` on, and the offset after the last complete line."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        entries = []
+        for line in data[:end].decode("utf-8").splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn line from an interrupted write; the ID will simply be seen again.
+                continue
+        return entries, offset + end
+
+    def _load(self):
+        rekeyed = 0
+        entries, self._offset = self._read_entries(self.path)
+        for entry in entries:
+            key = job_key(entry["company"], entry["id"])
+            if key[1] != entry["id"]:
+                # Written before IDs were canonicalized
+                entry = dict(entry, id=key[1])
+                rekeyed += 1
+            self._remember(key, entry)
+
+        if rekeyed:
+            self._rewrite()
+            print(f"[*] Migrated {rekeyed} seen IDs in {self.path} to canonical keys ({len(self._entries)} unique)")
+
+    def _migrate(self):
+        try:
+            with open(self.legacy_path, "r") as f:
+                legacy_ids = json.load(f)
+        except (OSError, ValueError):
+            return
+        migrated_at = _now()
+        for job_id in legacy_ids:
+            key = job_key(guess_company(job_id), job_id)
+            if key not in self._entries:
+                entry = {"id": key[1], "company": key[0], "first_seen": migrated_at}
+                self._remember(key, entry)
+                self._pending.append(entry)
+        self.save()
+        print(f"[*] Migrated {len(self._entries)} IDs from {self.legacy_path} to {self.path}")
+
+    def _remember(self, key, entry):
+        # A key with several lines (a re-sighting, or migrated IDs that collapse onto
+        # one key) keeps the earliest first_seen and the latest last_seen
+        current = self._entries.get(key)
+        if current is not None:
+            self._superseded += 1
+            entry = dict(current, **entry)
+            entry["first_seen"] = min(current["first_seen"], entry["first_seen"])
+            entry["last_seen"] = max(_last_seen(current), _last_seen(entry))
+        self._entries[key] = entry
+        if entry.get("fingerprint"):
+            # The earliest posting with a fingerprint keeps it; its own updates replace it
+            mapped = self._fingerprints.get((key[0], entry["fingerprint"]))
+            if mapped is None or (mapped["company"], mapped["id"]) == key:
+                self._fingerprints[(key[0], entry["fingerprint"])] = entry
+        return entry
+
+    def _sighted(self, key):
+        """Records that a known key was seen again, if its last_seen is getting stale."""
+        entry = self._entries[key]
+        now = datetime.now(timezone.utc)
+        if datetime.fromisoformat(_last_seen(entry)) >= now - timedelta(days=SIGHTING_REFRESH_DAYS):
+            return
+        self._pending.append(self._remember(key, dict(entry, last_seen=now.isoformat(timespec="seconds"))))
+
+    def __contains__(self, key):
+        """`key` is a (company, raw_id) pair."""
+        return job_key(*key) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, company, job_id):
+        return self._entries.get(job_key(company, job_id))
+
+    def known_before(self, company, job_id, timestamp):
+        """True if the job was first seen before `timestamp` (an ISO string like the ones stored)."""
+        entry = self._entries.get(job_key(company, job_id))
+        return entry is not None and entry["first_seen"] < timestamp
+
+    def repost_of(self, company, fingerprint, since):
+        """The entry of an earlier posting from `company` with the same fingerprint first seen after `since`, if any."""
+        entry = self._fingerprints.get((company, fingerprint))
+        if entry is not None and entry["first_seen"] >= since:
+            return entry
+        return None
+
+    def add(self, company, job_id, fingerprint=None):
+        """Marks the job as seen. Returns False if it already was (and records the sighting)."""
+        key = job_key(company, job_id)
+        with self._lock:
+            if key in self._entries:
+                self._sighted(key)
+                return False
+            entry = {"id": key[1], "company": company, "first_seen": _now()}
+            if fingerprint:
+                entry["fingerprint"] = fingerprint
+            if not self.shared:
+                self._remember(key, entry)
+                self._pending.append(entry)
+                return True
+
+            with locked(self.path):
+                # Pick up what other processes appended, then claim the key on disk
+                if os.path.exists(self.path):
+                    entries, self._offset = self._read_entries(self.path, self._offset)
+                    for other in entries:
+                        self._remember((other["company"], other["id"]), other)
+                if key in self._entries:
+                    self._sighted(key)
+                    return False
+                self._remember(key, entry)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+                    self._offset = f.tell()
+            return True
+
+    def merge_from(self, path):
+        """Adds the entries of another log (e.g. a shard's) that this one lacks, and its
+        newer sightings of ones it has. Returns how many were new."""
+        entries, _ = self._read_entries(path)
+        added = 0
+        with self._lock:
+            for entry in entries:
+                key = job_key(entry["company"], entry["id"])
+                current = self._entries.get(key)
+                if current is None or _last_seen(entry) > _last_seen(current):
+                    self._pending.append(self._remember(key, dict(entry, id=key[1])))
+                    added += current is None
+        return added
+
+    def save(self):
+        """Appends IDs added since the last save. Returns how many were written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            with locked(self.path) if self.shared else nullcontext(), open(self.path, "a", encoding="utf-8") as f:
+                for entry in self._pending:
+                    f.write(json.dumps(entry) + "\n")
+            written = len(self._pending)
+            self._pending = []
+            return written
+
+    def expire(self, max_age_days):
+        """Drops entries last seen more than `max_age_days` ago and compacts the log.
+
+        This is the only operation that rewrites the file, and only when something
+        expired or re-sightings have left more stale lines than live ones.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        with self._lock:
+            keep = {
+                key: entry for key, entry in self._entries.items()
+                if datetime.fromisoformat(_last_seen(entry)) >= cutoff
+            }
+            expired = len(self._entries) - len(keep)
+            if not expired and self._superseded <= len(self._entries):
+                return 0
+            self._entries = keep
+            self._fingerprints = {
+                fp: entry for fp, entry in self._fingerprints.items()
+                if self._entries.get((entry["company"], entry["id"])) is entry
+            }
+            self._rewrite()
+            return expired
+
+    def _rewrite(self):
+        # Whole-file rewrite of every entry, pending ones included
+        self._pending = []
+        self._superseded = 0
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry) + "\n")
+            self._offset = f.tell()
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from canonical import REPOST_WINDOW_DAYS, fingerprint, job_key, native_id
+
+
+# Offline regression checks for the bookkeeping the alerts depend on: job
+# identity, the seen log, poll scheduling and sharding. No network or browser.
+# Usage: python selfcheck.py
+# Prints each failed expectation and exits non-zero if there was one.
+
+# The legacy seen list, if present: its IDs must keep folding onto the same keys
+LEGACY_DB = "seen_jobs.json"
+LEGACY_IDS, LEGACY_KEYS = 2861, 2508
+
+
+class Checker:
+    def __init__(self):
+        self.checked = 0
+        self.failures = 0
+
+    def expect(self, name, got, expected):
+        self.checked += 1
+        if got != expected:
+            self.failures += 1
+            print(f"[!] {name}: got {got!r}, expected {expected!r}")
+
+
+def check_ids(c):
+    """canonical.native_id on every ID shape the scrapers and older runs produced."""
+    shapes = {
+        # Microsoft (Eightfold): API-built path and the rendered href with tracking noise
+        "/careers/job/1970393556659104": "1970393556659104",
+        "https://apply.careers.microsoft.com/careers/job/1970393556659104?domain=microsoft.com&hl=en":
+            "1970393556659104",
+        # Workday: bare requisition (older runs), externalPath and full URL
+        "JR1998877": "JR1998877",
+        "jr1998877": "JR1998877",
+        "/job/US-CA-Santa-Clara/Software-Engineer_JR1998877": "JR1998877",
+        "/job/US-CA-Santa-Clara/Software-Engineer_JR1998877-1": "JR1998877-1",
+        "https://acme.wd1.myworkdayjobs.com/Careers/job/London/Data-Scientist_R-12345?source=li": "R-12345",
+        # Apple: position ID with and without the team suffix, and the posting URL
+        "200554357": "200554357",
+        "200554357-0836": "200554357",
+        "https://jobs.apple.com/en-us/details/200554357/software-engineer?team=SFTWR": "200554357",
+        # Link pages: the URL path without host, query or trailing slash
+        "https://microsoft.ai/job/software-engineer-3/?utm_source=x": "/job/software-engineer-3",
+    }
+    for raw_id, expected in shapes.items():
+        c.expect(f"native_id({raw_id!r})", native_id(raw_id), expected)
+
+    a = {"title": "Software Engineer, ML", "location": "Redmond,  WA"}
+    b = {"title": "software engineer - ml", "location": "redmond wa"}
+    c.expect("fingerprint ignores case and punctuation", fingerprint(a), fingerprint(b))
+    # Repost suppression is opt-in per source
+    c.expect("REPOST_WINDOW_DAYS", REPOST_WINDOW_DAYS, 0)
+
+    if os.path.exists(LEGACY_DB):
+        from seen_store import guess_company
+        with open(LEGACY_DB, "r") as f:
+            legacy_ids = json.load(f)
+        keys = {job_key(guess_company(job_id), job_id) for job_id in legacy_ids}
+        c.expect(f"{LEGACY_DB} IDs -> keys", (len(legacy_ids), len(keys)), (LEGACY_IDS, LEGACY_KEYS))
+
+
+def _days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(timespec="seconds")
+
+
+def check_seen_store(c):
+    """SeenStore migration, expiry by last sighting and shared-mode claiming."""
+    from seen_store import SIGHTING_REFRESH_DAYS, SeenStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log, legacy = os.path.join(tmp, "seen.jsonl"), os.path.join(tmp, "seen.json")
+        with open(legacy, "w") as f:
+            json.dump(["200554357", "200554357-0836", "JR1998877", "/careers/job/1970393556659104"], f)
+        store = SeenStore(log, legacy)
+        c.expect("migrated keys", len(store), 3)
+        c.expect("migrated company", store.get("NVIDIA", "JR1998877")["company"], "NVIDIA")
+        c.expect("migration wrote the log", len(SeenStore(log, None)), 3)
+
+        # Expiry goes by the last sighting: old but re-sighted stays, old and unseen goes
+        with open(log, "w") as f:
+            for job_id, first, last in [("1", 400, None), ("2", 400, 10), ("3", 400, None), ("4", 5, None)]:
+                entry = {"id": job_id, "company": "Apple", "first_seen": _days_ago(first)}
+                if last is not None:
+                    entry["last_seen"] = _days_ago(last)
+                f.write(json.dumps(entry) + "\n")
+        store = SeenStore(log, None)
+        c.expect("add() of a known ID", store.add("Apple", "3"), False)  # a sighting
+        store.save()
+        c.expect("expired", store.expire(180), 1)
+        c.expect("kept after expiry", [store.get("Apple", job_id) is not None for job_id in "1234"],
+                 [False, True, True, True])
+        reloaded = SeenStore(log, None)
+        c.expect("first_seen kept on a sighting", reloaded.get("Apple", "3")["first_seen"], _days_ago(400))
+        c.expect("last_seen refreshed", reloaded.get("Apple", "3")["last_seen"] > _days_ago(SIGHTING_REFRESH_DAYS), True)
+        c.expect("recent sighting not re-appended", (reloaded.add("Apple", "4"), reloaded.save()), (False, 0))
+
+        # Shared mode: processes see each other's claims through the file
+        shared = os.path.join(tmp, "shared.jsonl")
+        first, second = SeenStore(shared, None, shared=True), SeenStore(shared, None, shared=True)
+        c.expect("first claim", first.add("NVIDIA", "JR1"), True)
+        c.expect("second claim of the same job", second.add("NVIDIA", "/job/US/Engineer_JR1"), False)
+        c.expect("second claims its own", second.add("NVIDIA", "JR2"), True)
+        c.expect("first sees it", first.add("NVIDIA", "JR2"), False)
+        c.expect("shared log", len(SeenStore(shared, None)), 2)
+
+        # Sources are swept to the end periodically, so postings past the usual stop point are sighted
+        from incremental import CrawlState
+        state = CrawlState(os.path.join(tmp, "state.json"))
+        c.expect("sweep due at first", state.sweep_due("Apple|ML"), True)
+        state.commit("Apple|ML")
+        c.expect("sweep due after a crawl that stopped early", state.sweep_due("Apple|ML"), True)
+        state.commit("Apple|ML", swept=True)
+        c.expect("sweep due after a sweep", state.sweep_due("Apple|ML"), False)
+
+
+def check_scheduler(c):
+    """SourceSchedule backoff doubles from the pre-failure interval, clamped, and resets on success."""
+    from scheduler import SourceSchedule
+
+    schedule = SourceSchedule("Apple", 10, 5, 120)
+    c.expect("backoff", [schedule.update(0, True, now) for now in range(5)], [20, 40, 80, 120, 120])
+    c.expect("interval after recovering", schedule.update(0, False, 10), 10)
+    c.expect("backoff after recovering", schedule.update(0, True, 20), 20)
+
+
+def check_sharding(c):
+    """sharding.assign: by company, balanced by query count, the same for any source order."""
+    from types import SimpleNamespace
+
+    import sharding
+
+    def source(company, queries):
+        return SimpleNamespace(name=f"{company} {len(queries)}", company=company, queries=queries)
+
+    sources = [source("Apple", ["ML", "Software", "Data"]), source("Microsoft", [None]),
+               source("Microsoft AI", [None]), source("NVIDIA", ["New Grad"]), source("Apple", ["Swift"])]
+    c.expect("2 shards", sharding.assign(sources, 2),
+             {"Apple": 0, "Microsoft": 1, "Microsoft AI": 1, "NVIDIA": 1})
+    c.expect("3 shards", sharding.assign(sources, 3),
+             {"Apple": 0, "Microsoft": 1, "Microsoft AI": 2, "NVIDIA": 1})
+    c.expect("same in any order", sharding.assign(sources[::-1], 3), sharding.assign(sources, 3))
+
+    from scrapers import load_sources
+    sources = load_sources()
+    companies = {s.company for s in sources}
+    for count in range(1, len(companies) + 1):
+        shards = [sharding.select(sources, index, count) for index in range(count)]
+        c.expect(f"{count} shards cover every source once",
+                 sorted(s.name for shard in shards for s in shard), sorted(s.name for s in sources))
+        c.expect(f"{count} shards, none empty", all(shards), True)
+
+
+CHECKS = [check_ids, check_seen_store, check_scheduler, check_sharding]
+
+
+def main():
+    c = Checker()
+    for check in CHECKS:
+        check(c)
+    print(f"[*] {c.checked - c.failures}/{c.checked} checks passed")
+    return 1 if c.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
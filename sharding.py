@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import time
+
+from incremental import CrawlState
+from locking import locked
+from seen_store import SeenStore
+
+
+# Splitting the source list across processes (`watcher.py --workers N`) or CI jobs
+# (`watcher.py --shard I/N` in a matrix, then `watcher.py --merge` on their outputs).
+#
+# Sources are assigned by company, so every (company, native_id) key belongs to
+# exactly one shard: separate CI jobs with separate copies of the seen log can
+# never both alert on the same job. Queries of one source stay together, which
+# keeps per-site concurrency and rate limits meaningful.
+#
+# Companies are weighted by their number of queries (one task each) and dealt
+# heaviest first to the least loaded shard, ties broken by name and shard
+# index, so the split is even and the same in every process.
+
+
+def parse_shard(value):
+    """"2/4" -> (2, 4): shard index (from 0) and shard count."""
+    index, _, count = value.partition("/")
+    index, count = int(index), int(count)
+    if not 0 <= index < count:
+        raise ValueError(f"Shard {value} is out of range")
+    return index, count
+
+
+def assign(sources, count):
+    """{company: shard index} for `count` shards."""
+    weights = {}
+    for source in sources:
+        weights[source.company] = weights.get(source.company, 0) + len(source.queries)
+    loads = [0] * count
+    shards = {}
+    for company in sorted(weights, key=lambda c: (-weights[c], c)):
+        index = min(range(count), key=lambda i: (loads[i], i))
+        shards[company] = index
+        loads[index] += weights[company]
+    return shards
+
+
+def select(sources, index, count):
+    shards = assign(sources, count)
+    return [source for source in sources if shards[source.company] == index]
+
+
+def run_workers(count, script="watcher.py"):
+    """Runs `count` shard processes of `script` side by side. Returns the number that failed."""
+    start = time.perf_counter()
+    workers = [
+        subprocess.Popen([sys.executable, script, "--shard", f"{index}/{count}"])
+        for index in range(count)
+    ]
+    failed = sum(1 for worker in workers if worker.wait() != 0)
+    print(f"[*] {count} workers finished in {time.perf_counter() - start:.1f}s ({failed} failed)")
+    return failed
+
+
+def _read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line for line in f if line.endswith("\n")]
+
+
+def merge_outboxes(base_path, shard_paths):
+    """Unsent alerts after the shards ran: each shard only sends (and removes) its own
+    companies' alerts, so an alert the run started with is still due if every shard
+    kept it, and an alert a shard added is due if it is in that shard's copy."""
+    base = _read_lines(base_path)
+    # A shard that left no outbox behind (e.g. it failed to start) changed nothing
+    copies = [set(_read_lines(path)) for path in shard_paths if os.path.exists(path)]
+    lines = [line for line in base if all(line in copy for copy in copies)]
+    known = set(base)
+    for path in shard_paths:
+        for line in _read_lines(path):
+            if line not in known:
+                lines.append(line)
+                known.add(line)
+    with locked(base_path):
+        with open(base_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+    return len(lines)
+
+
+def append_new_lines(path, shard_paths):
+    """Appends the lines of append-only logs (metrics, dead letters) that `path` lacks."""
+    known = set(_read_lines(path))
+    for shard_path in shard_paths:
+        new_lines = [line for line in _read_lines(shard_path) if line not in known]
+        with locked(path), open(path, "a", encoding="utf-8") as f:
+            f.writelines(new_lines)
+        known.update(new_lines)
+
+
+def merge(shard_dirs, seen_path, state_path, metrics_path, outbox_path, dead_letter_path):
+    """Folds the seen log, crawl state, metrics, outbox and dead letters written by each shard into the main files."""
+    seen_jobs = SeenStore(seen_path, None)
+    crawl_state = CrawlState(state_path)
+
+    def in_shards(path):
+        return [os.path.join(shard_dir, os.path.basename(path)) for shard_dir in shard_dirs]
+
+    for shard_dir in shard_dirs:
+        shard_seen = os.path.join(shard_dir, os.path.basename(seen_path))
+        shard_state = os.path.join(shard_dir, os.path.basename(state_path))
+        added = seen_jobs.merge_from(shard_seen) if os.path.exists(shard_seen) else 0
+        if os.path.exists(shard_state):
+            crawl_state.merge_from(shard_state)
+        print(f"[*] Merged {shard_dir}: {added} new seen IDs")
+    append_new_lines(metrics_path, in_shards(metrics_path))
+    append_new_lines(dead_letter_path, in_shards(dead_letter_path))
+
+    unsent = merge_outboxes(outbox_path, in_shards(outbox_path))
+    if unsent:
+        print(f"[!] {unsent} alerts in {outbox_path} are still to be sent")
+
+    seen_jobs.save()
+    crawl_state.save()
+    return seen_jobs
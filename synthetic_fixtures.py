@@ -0,0 +1,192 @@
+import json
+import os
+import sys
+from urllib.parse import parse_qsl, urlparse
+
+import apple_api
+import microsoft_api
+from replay import FIXTURES_DIR, _slug, request_key
+from scrapers import load_sources
+
+
+# Synthetic fixtures for bench_replay.py: made-up but well-formed responses for
+# every configured source, so the replay benchmark runs in CI (and on a laptop)
+# without anyone recording from the live sites first. The same inputs always
+# produce the same files, so bench_baseline.json's job counts stay valid.
+#
+#   python synthetic_fixtures.py    rewrites fixtures/http.json and fixtures/har/
+#
+# Live recordings (`bench_replay.py --record`) replace these for a source.
+
+TITLES = [
+    "Software Engineer",
+    "Software Engineer II",
+    "Senior Software Engineer",
+    "Machine Learning Engineer",
+    "Data Scientist",
+    "Applied Scientist",
+    "Hardware Design Engineer",
+    "Product Manager",
+    "Software Engineer, New College Grad",
+    "Research Engineer, Deep Learning",
+]
+LOCATIONS = ["Redmond, Washington, United States", "Santa Clara, California, United States",
+             "Austin, Texas, United States", "Hyderabad, India", "London, United Kingdom"]
+POSTED = 1760000000  # a fixed epoch so the files don't change between runs
+
+
+def _posting(n):
+    """The n-th synthetic posting: a title, location and description, cycling through the lists."""
+    return {
+        "title": TITLES[n % len(TITLES)],
+        "location": LOCATIONS[(n // 2) % len(LOCATIONS)],
+        "description": f"<p>Requirements</p><ul><li>{n % 6}+ years of software development experience</li></ul>",
+    }
+
+
+class Fixtures:
+    def __init__(self):
+        self.exchanges = {}
+
+    def add(self, method, url, body, params=None, json_body=None, status=200, headers=None):
+        text = body if isinstance(body, str) else json.dumps(body)
+        self.exchanges[request_key(method, url, params, json_body)] = {
+            "status": status,
+            "headers": {"content-type": "application/json" if not isinstance(body, str) else "text/html",
+                        **(headers or {})},
+            "text": text,
+        }
+
+
+def add_apple(fixtures, source):
+    fixtures.add("GET", apple_api.CSRF_URL, "", headers={"x-apple-csrf-token": "synthetic"})
+    for q, query in enumerate(source.queries):
+        # Overlapping IDs across queries, as the real search returns
+        results = []
+        for n in range(q * 6, q * 6 + 12):
+            posting = _posting(n)
+            city, _, country = posting["location"].rpartition(", ")
+            results.append({
+                "positionId": f"2000{n:04d}",
+                "transformedPostingTitle": posting["title"].lower().replace(" ", "-"),
+                "postingTitle": posting["title"],
+                "locations": [{"name": city, "countryName": country}],
+            })
+        payload = {
+            "query": query,
+            "filters": {"postingpostLocation": ["postLocation-USA"]},
+            "page": 1,
+            "locale": "en-us",
+            "sort": "newest",
+        }
+        fixtures.add("POST", apple_api.SEARCH_URL, {"searchResults": results, "totalRecords": len(results)},
+                     json_body=payload)
+
+
+def add_microsoft(fixtures, source):
+    params = {k: v for k, v in parse_qsl(urlparse(source.url).query) if k in microsoft_api.FORWARDED_PARAMS}
+    params.update({"start": 0, "num": microsoft_api.PAGE_SIZE})
+    positions = []
+    for n in range(8):
+        posting = _posting(n)
+        position_id = 1970393556000000 + n
+        positions.append({"id": position_id, "name": posting["title"], "location": "United States"})
+        fixtures.add("GET", microsoft_api.details_url(position_id), {
+            "id": position_id,
+            "name": posting["title"],
+            "locations": [posting["location"]],
+            "t_create": POSTED,
+            "department": "Engineering",
+            "job_description": posting["description"],
+        })
+    fixtures.add("GET", microsoft_api.JOBS_API_URL, {"positions": positions, "count": len(positions)}, params=params)
+
+
+def add_workday(fixtures, source):
+    base = source.api_url.rsplit("/", 1)[0]
+    for query in source.queries:
+        postings = []
+        for n in range(15):
+            posting = _posting(n)
+            path = f"/job/US-CA-Santa-Clara/{posting['title'].replace(' ', '-').replace(',', '')}_JR{2000000 + n}"
+            postings.append({
+                "title": posting["title"],
+                "externalPath": path,
+                "locationsText": "2 Locations" if n % 3 == 0 else posting["location"],
+                "bulletFields": [f"JR{2000000 + n}"],
+            })
+            fixtures.add("GET", base + path, {"jobPostingInfo": {
+                "title": posting["title"],
+                "location": posting["location"],
+                "additionalLocations": [],
+                "startDate": "2025-10-09",
+                "jobDescription": posting["description"],
+            }})
+        payload = {"appliedFacets": {}, "limit": 20, "offset": 0, "searchText": query or ""}
+        fixtures.add("POST", source.api_url, {"total": len(postings), "jobPostings": postings}, json_body=payload)
+
+
+def _har_entry(url, html):
+    return {
+        "startedDateTime": "2025-10-09T00:00:00.000Z",
+        "time": 0,
+        "request": {"method": "GET", "url": url, "httpVersion": "HTTP/1.1", "headers": [],
+                    "queryString": [], "cookies": [], "headersSize": -1, "bodySize": 0},
+        "response": {"status": 200, "statusText": "OK", "httpVersion": "HTTP/1.1",
+                     "headers": [{"name": "content-type", "value": "text/html; charset=utf-8"}], "cookies": [],
+                     "content": {"size": len(html), "mimeType": "text/html", "text": html},
+                     "redirectURL": "", "headersSize": -1, "bodySize": len(html)},
+        "cache": {},
+        "timings": {"send": 0, "wait": 0, "receive": 0},
+    }
+
+
+def add_link_page(fixtures, source, har_dir):
+    origin = f"{urlparse(source.url).scheme}://{urlparse(source.url).hostname}"
+    cards = []
+    for n in range(10):
+        posting = _posting(n)
+        url = f"{origin}/job/{posting['title'].lower().replace(' ', '-').replace(',', '')}-{n}/"
+        cards.append(f'<div class="job"><a href="{url}">{posting["title"]}</a> <span>{posting["location"]}</span></div>')
+        city, _, country = posting["location"].rpartition(", ")
+        ld_json = json.dumps({"@context": "https://schema.org", "@type": "JobPosting", "title": posting["title"],
+                              "datePosted": "2025-10-09",
+                              "jobLocation": {"@type": "Place", "address": {"addressLocality": city,
+                                                                             "addressCountry": country}},
+                              "description": posting["description"]})
+        fixtures.add("GET", url, f'<html><head><script type="application/ld+json">{ld_json}</script></head>'
+                                 f'<body><h1>{posting["title"]}</h1></body></html>')
+    page = f"<html><body><h1>Careers</h1>{''.join(cards)}</body></html>"
+    if source.config.get("probe"):
+        fixtures.add("GET", source.url, page)  # the change probe
+
+    os.makedirs(har_dir, exist_ok=True)
+    har = {"log": {"version": "1.2", "creator": {"name": "synthetic_fixtures", "version": "1"},
+                   "entries": [_har_entry(source.url, page)]}}
+    with open(os.path.join(har_dir, f"{_slug(source.name)}-1.har"), "w") as f:
+        json.dump(har, f, indent=1)
+
+
+BUILDERS = {"apple": add_apple, "microsoft": add_microsoft, "workday": add_workday}
+
+
+def main():
+    fixtures = Fixtures()
+    har_dir = os.path.join(FIXTURES_DIR, "har")
+    for source in load_sources():
+        if source.backend == "link_page":
+            add_link_page(fixtures, source, har_dir)
+        elif source.backend in BUILDERS:
+            BUILDERS[source.backend](fixtures, source)
+        else:
+            print(f"[!] No synthetic fixtures for backend '{source.backend}' ({source.name})")
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with open(os.path.join(FIXTURES_DIR, "http.json"), "w") as f:
+        json.dump(fixtures.exchanges, f, indent=1, sort_keys=True)
+    print(f"[+] Wrote {len(fixtures.exchanges)} HTTP exchanges and HAR files to {FIXTURES_DIR}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
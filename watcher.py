@@ -1,13 +1,25 @@
-import json
+import argparse
+import asyncio
+import shutil
+import signal
+import sys
 import time
-import random
 import os
-import sys
-from datetime import datetime
-from playwright.sync_api import sync_playwright
-import requests # For sending the Discord notification
-import smtplib
-from email.message import EmailMessage
+from playwright.async_api import async_playwright
+
+import blocking
+import metrics
+import sharding
+from engine import Engine
+from enrichment import Enricher
+from http_cache import dir_size, is_warm
+from http_client import get_client
+from incremental import CrawlState
+from notifier import Notifier
+from pipeline import Pipeline
+from scheduler import PollScheduler
+from scrapers import RunContext, load_sources
+from seen_store import SeenStore
 
 
 # --- CONFIGURATION ---
@@ -18,397 +30,297 @@ if not WEBHOOK_URL:
     print("[!] Error: DISCORD_WEBHOOK_URL not set.")
     # sys.exit(1) # Commented out to allow running without Discord webhook
 
-# 2. Define the Microsoft Jobs URL with your specific filters.
-# I have pre-filled this for "Software Engineer" in the "United States". 
-# IMPORTANT: Adjust the 'lc' (Location) or 'q' (Query) as needed.
-MICROSOFT_URL = "https://apply.careers.microsoft.com/careers?domain=microsoft.com&hl=en&start=0&location=United+States&pid=1970393556659104&sort_by=timestamp&filter_include_remote=1&filter_profession=software+engineering&filter_seniority=Entry"
-
-# Apple Config
-APPLE_BASE_URL = "https://jobs.apple.com/en-us/search"
-APPLE_KEYWORDS = ["Machine Learning", "ML", "Software", "Data"]
-
-# File to store jobs we've already seen
-DB_FILE = "seen_jobs.json"
-
-
-def send_discord_notification(job):
-    """Sends a push notification via Discord."""
-    if not WEBHOOK_URL: return
-    
-    data = {
-        "content": f"🚨 **NEW JOB DETECTED!** 🚨\n\n**{job['title']}**\nCompany: {job['company']}\nLocation: {job['location']}\n[Apply Now]({job['url']})"
-    }
-    try:
-        requests.post(WEBHOOK_URL, json=data)
-        print(f"[-] Discord notification sent for {job['id']}")
-    except Exception as e:
-        print(f"[!] Failed to send Discord notification: {e}")
-
-def send_email_notification(job):
-    # Credentials from Environment Variables
-    EMAIL_ADDRESS = os.environ.get("EMAIL_USER")
-    EMAIL_PASSWORD = os.environ.get("EMAIL_PASS") # The 16-char App Password
-    
-    print(f"DEBUG: Email User is set: {bool(EMAIL_ADDRESS)}")
-    print(f"DEBUG: Email Pass is set: {bool(EMAIL_PASSWORD)}")
-
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        print("[!] Email credentials missing.")
-        return
-
-    msg = EmailMessage()
-    msg['Subject'] = f"New Job: {job['title']} ({job['company']})"
-    msg['From'] = "namandalsania12@gmail.com"
-    msg['To'] = "namandalsania12@gmail.com" # Send to yourself
-    
-    body = (
-        f"Title: {job['title']}\n"
-        f"Company: {job['company']}\n"
-        f"Location: {job['location']}\n"
-        f"Apply Here: {job['url']}"
+# 2. Companies, queries and filters live in sources.toml (see scrapers.py for the backends).
+SOURCES_FILE = "sources.toml"
+
+# Files to store jobs we've already seen (append-only log + the legacy JSON list it migrates from)
+DB_FILE = "seen_jobs.jsonl"
+LEGACY_DB_FILE = "seen_jobs.json"
+
+# Per-source high-water marks and change probes for incremental crawling
+CRAWL_STATE_FILE = "crawl_state.json"
+
+# Alerts are written here until they have been sent, so a crashed run's alerts go out with the next one
+OUTBOX_FILE = "outbox.jsonl"
+# Alerts a channel rejected outright or that kept failing (see notifier.py); kept for a look, never re-sent
+DEAD_LETTER_FILE = "outbox_dead.jsonl"
+
+# Seen IDs not sighted for this long are forgotten so the log doesn't grow forever.
+# Every source is swept to the end each incremental.SWEEP_EVERY_DAYS, so live ones are sighted.
+SEEN_JOBS_MAX_AGE_DAYS = 180
+
+# Browser profile (Chromium's disk cache of site JS bundles, cookies) kept between runs;
+# the workflow saves and restores .cache/. Set PERSISTENT_BROWSER = False for a fresh browser.
+PERSISTENT_BROWSER = True
+BROWSER_PROFILE_DIR = os.path.join(".cache", "browser")
+BROWSER_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Chromium evicts its own cache beyond this
+
+# One JSON record per run (timings per source and phase, counts, errors); `python metrics.py` summarizes it
+METRICS_FILE = "metrics.jsonl"
+
+# Email credentials from Environment Variables
+EMAIL_USER = os.environ.get("EMAIL_USER")
+EMAIL_PASS = os.environ.get("EMAIL_PASS") # The 16-char App Password
+
+
+def load_seen_jobs(shared=False):
+    return SeenStore(DB_FILE, LEGACY_DB_FILE, shared=shared)
+
+def save_seen_jobs(seen_jobs):
+    written = seen_jobs.save()
+    expired = seen_jobs.expire(SEEN_JOBS_MAX_AGE_DAYS)
+    if expired:
+        print(f"[*] Expired {expired} seen jobs not sighted in {SEEN_JOBS_MAX_AGE_DAYS} days.")
+    return written
+
+def prune_browser_profile(profile_dir=BROWSER_PROFILE_DIR):
+    # The disk cache is bounded by Chromium; this catches everything else a profile accumulates
+    size = dir_size(profile_dir)
+    if size > 2 * BROWSER_CACHE_MAX_BYTES:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        print(f"[*] Browser profile reached {size / 1024 / 1024:.0f} MB, removed (next run starts cold).")
+
+def make_enricher(sources, client):
+    """The detail fetcher, if any source has `enrich = true` (see enrichment.py)."""
+    if any(source.enrich for source in sources):
+        return Enricher(client)
+    return None
+
+async def launch_browser(p, profile_dir=BROWSER_PROFILE_DIR):
+    """Returns (browser or persistent context, persistent) and logs cold vs warm launch time."""
+    start = time.perf_counter()
+    if not PERSISTENT_BROWSER:
+        browser = await p.chromium.launch(headless=True, args=blocking.CHROMIUM_ARGS)
+        print(f"[*] Browser launched in {time.perf_counter() - start:.1f}s (fresh profile)")
+        return browser, False
+
+    warm = is_warm(profile_dir)
+    context = await p.chromium.launch_persistent_context(
+        profile_dir,
+        headless=True,
+        args=blocking.CHROMIUM_ARGS + [f"--disk-cache-size={BROWSER_CACHE_MAX_BYTES}"],
+        **blocking.CONTEXT_OPTIONS,
     )
-    msg.set_content(body)
-
-    try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            smtp.send_message(msg)
-        print(f"[-] Email sent for {job['id']}")
-    except Exception as e:
-        print(f"[!] Email failed: {e}")
-
-def load_seen_jobs():
-    if not os.path.exists(DB_FILE):
-        return []
-    try:
-        with open(DB_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
-
-def save_seen_jobs(jobs):
-    with open(DB_FILE, 'w') as f:
-        json.dump(jobs, f)
-
-def scrape_microsoft(page, seen_jobs):
-    print(f"[*] Checking Microsoft Careers: {datetime.now().strftime('%H:%M:%S')}")
-    new_count = 0
-    try:
-        page.goto(MICROSOFT_URL, timeout=60000)
-        page.wait_for_selector('div[data-test-id="job-listing"]', timeout=15000)
-        
-        job_cards = page.locator('div[data-test-id="job-listing"]').all()
-        for card in job_cards[:15]:
-            try:
-                link_el = card.locator('a').first
-                raw_text = link_el.inner_text()
-                relative_link = link_el.get_attribute('href')
-                full_link = f"https://apply.careers.microsoft.com{relative_link}"
-                
-                lines = [line.strip() for line in raw_text.split('\n') if line.strip()]
-                title = lines[0] if lines else 'N/A'
-                job_id = relative_link
-                
-                # Seniority Check
-                excluded_keywords = ["senior", "principal", "lead", "manager", "director", "sr.", " ii", " iii", " iv"]
-                if any(kw in title.lower() for kw in excluded_keywords):
-                    continue
-
-                if job_id not in seen_jobs:
-                    job_data = {
-                        "id": job_id,
-                        "title": title,
-                        "company": "Microsoft",
-                        "location": "United States", 
-                        "url": full_link
-                    }
-                    send_email_notification(job_data)
-                    send_discord_notification(job_data)
-                    seen_jobs.append(job_id)
-                    new_count += 1
-            except Exception as e:
-                print(f"[!] Error Microsoft card: {e}")
-                continue
-    except Exception as e:
-        print(f"[!] Microsoft scrape error: {e}")
-    
-    return new_count
-
-def scrape_microsoft_ai(page, seen_jobs):
-    AI_URL = "https://microsoft.ai/careers/?selected_regions=redmond-united-states"
-    print(f"[*] Checking Microsoft AI Careers: {datetime.now().strftime('%H:%M:%S')}")
-    new_count = 0
-    target_roles = ["Software Engineer", "Applied Scientist", "Machine Learning", "Data"]
-    
-    try:
-        # Navigate to filtered URL
-        page.goto(AI_URL, timeout=60000)
-        
-        # Wait for potential content loading
-        page.wait_for_timeout(5000)
-        
-        # Scroll to bottom to trigger lazy loading
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        page.wait_for_timeout(3000)
-        
-        # Generic strategy: Find all links and filter by text
-        links = page.locator("a").all()
-        
-        for link in links:
-            try:
-                text = link.inner_text().strip()
-                href = link.get_attribute("href")
-                
-                if not href or "microsoft.ai" not in href and not href.startswith("/"):
-                    continue
-                    
-                # Check if text matches any target role
-                if any(role.lower() in text.lower() for role in target_roles):
-                    # Negative Keyword Check (Filter out >2 years experience roles)
-                    # "Senior", "Principal", "Lead", "Manager", "Director", "Sr"
-                    excluded_keywords = ["senior", "principal", "lead", "manager", "director", "sr.", " ii", " iii", " iv"]
-                    if any(kw in text.lower() for kw in excluded_keywords):
-                        continue
-
-                    # It's a job link! (Validation: usually job titles are link text)
-                    if "careers" not in href and "job" not in href:
-                         # Double check it's not a generic nav link like "Careers Home"
-                         if len(text) < 5 or "Carrers" in text or "Home" in text: continue
-
-                    job_id = href # Use full URL or unique part as ID
-                    full_link = href
-                    if href.startswith("/"):
-                        full_link = f"https://microsoft.ai{href}"
-                    
-                    if job_id not in seen_jobs:
-                        # Location Check via Parent Element
-                        try:
-                            parent_text = link.locator("xpath=..").inner_text().lower()
-                            # Strict filter: Must contain Redmond or US/United States
-                            # Logic: If it doesn't have "redmond" AND doesn't have "united states"/"usa", PROBABLY skip?
-                            # But user said "Redmond, United States".
-                            # Let's start with a broad text check for US markers.
-                            
-                            is_valid_location = False
-                            for loc_marker in ["redmond", "united states", "usa", " us", ", us"]:
-                                if loc_marker in parent_text:
-                                    is_valid_location = True
-                                    break
-                            
-                            if not is_valid_location:
-                                # print(f"    [!] Skipped non-US job: {text}")
-                                continue
-                                
-                            # If valid, use the parent text as location source roughly
-                            location = "Redmond, United States" # Default since we verified it matches
-                            if "redmond" not in parent_text and ("united states" in parent_text or "usa" in parent_text):
-                                location = "United States"
-
-                        except:
-                            # If we can't verify location text, skip to be safe?
-                            # Or assume URL filter worked? User says it doesn't.
-                            continue
-
-                        job_data = {
-                            "id": job_id,
-                            "title": text,
-                            "company": "Microsoft AI",
-                            "location": location,
-                            "url": full_link
-                        }
-                        
-                        send_email_notification(job_data)
-                        send_discord_notification(job_data)
-                        seen_jobs.append(job_id)
-                        new_count += 1
-                        print(f"    [+] Found AI Job: {text}")
-                        
-            except Exception as e:
-                continue
+    print(f"[*] Browser launched in {time.perf_counter() - start:.1f}s ({'warm' if warm else 'cold'} start)")
+    return context, True
+
+async def run_scraper_async(shard=None):
+    """One sweep over every source, or over shard (index, count)'s share of them.
+
+    Shards can run side by side on the same files: the seen log and crawl state
+    are then written under a file lock, and only the unsharded run expires old IDs.
+    """
+    run_metrics = metrics.reset()
+    sources = load_sources(SOURCES_FILE)
+    profile_dir = BROWSER_PROFILE_DIR
+    if shard:
+        sources = sharding.select(sources, *shard)
+        # Chromium locks its profile, so each shard keeps its own
+        profile_dir = f"{BROWSER_PROFILE_DIR}-{shard[0]}"
+        print(f"[*] Shard {shard[0]}/{shard[1]}: {', '.join(s.name for s in sources) or 'no sources'}")
+        if not sources:
+            return
+    seen_jobs = load_seen_jobs(shared=shard is not None)
+    print(f"[*] Loaded {len(seen_jobs)} previously seen jobs, watching {len(sources)} sources.")
+    crawl_state = CrawlState(CRAWL_STATE_FILE, shared=shard is not None)
+    run_start = time.perf_counter()
+    warm = PERSISTENT_BROWSER and is_warm(profile_dir)
+
+    # Scrapers stream batches into the pipeline, which saves new IDs as it goes and
+    # queues alerts; they are sent in batches in the background and at the end
+    notifier = Notifier(WEBHOOK_URL, EMAIL_USER, EMAIL_PASS, outbox_path=OUTBOX_FILE,
+                        dead_letter_path=DEAD_LETTER_FILE)
+    notifier.start()
+    enricher = make_enricher(sources, get_client())
+    pipeline = Pipeline(seen_jobs, notifier, crawl_state, enricher)
+    pipeline.start(companies={source.company for source in sources})
+    ctx = RunContext(seen_jobs, notifier, crawl_state, get_client(), pipeline)
+
+    async with async_playwright() as p:
+        browser, persistent = await launch_browser(p, profile_dir)
+        engine = Engine(browser, site_limits={source.name: source.concurrency for source in sources},
+                        persistent=persistent)
+
+        # Every source (and every query of a source) is its own task.
+        # HTTP backends run in threads alongside the browser tasks.
+        for source in sources:
+            source.submit(engine, ctx)
 
-    except Exception as e:
-        print(f"[!] Microsoft AI scrape error: {e}")
-        
-    return new_count
+        scanned = await engine.run()
+        await browser.close()
+    if PERSISTENT_BROWSER:
+        prune_browser_profile(profile_dir)
 
-def scrape_apple(page, seen_jobs):
-    print(f"[*] Checking Apple Careers: {datetime.now().strftime('%H:%M:%S')}")
-    new_count = 0
-    
-    for keyword in APPLE_KEYWORDS:
+    pipeline.close()
+    if enricher:
+        enricher.close()
+    results = {site: 0 for site in scanned}
+    results.update(pipeline.take_counts())
+    notify_start = time.perf_counter()
+    notifier.close()
+    print(f"[*] Notifications flushed in {time.perf_counter() - notify_start:.1f}s")
+
+    for site, count in results.items():
+        print(f"[*] {site}: Found {count} new jobs.")
+    engine.report()
+    if enricher:
+        enricher.report()
+    get_client().report()
+    get_client().close()
+    print(f"[*] Total run time: {time.perf_counter() - run_start:.1f}s ({'warm' if warm else 'cold'} start)")
+
+    if sum(results.values()) == 0:
+        print("[*] No new jobs found.")
+    # New IDs were saved batch by batch; this expires old ones and saves the probes
+    print("[*] Updating database...")
+    with metrics.timer("db_save"):
+        if shard:
+            seen_jobs.save()
+        else:
+            save_seen_jobs(seen_jobs)
+            if enricher:
+                enricher.cache.evict()
+        crawl_state.save()
+
+    run_metrics.append(
+        METRICS_FILE,
+        durations={site: end - start for site, (start, end) in engine.timings.items()},
+        new_jobs=results,
+        http={host: stats.as_dict() for host, stats in get_client().stats.items()},
+        browser=engine.pool.block_stats.as_dict(),
+        shard=f"{shard[0]}/{shard[1]}" if shard else None,
+    )
+
+async def run_daemon_async():
+    """Polls each source on its own adaptive schedule (see scheduler.py) until SIGINT/SIGTERM.
+
+    The browser, HTTP pool, notifier and stores stay open between polls; state is
+    saved after every cycle and once more on shutdown.
+    """
+    sources = load_sources(SOURCES_FILE)
+    seen_jobs = load_seen_jobs()
+    print(f"[*] Daemon: loaded {len(seen_jobs)} previously seen jobs, watching {len(sources)} sources.")
+    crawl_state = CrawlState(CRAWL_STATE_FILE)
+    client = get_client()
+    notifier = Notifier(WEBHOOK_URL, EMAIL_USER, EMAIL_PASS, outbox_path=OUTBOX_FILE,
+                        dead_letter_path=DEAD_LETTER_FILE)
+    notifier.start()
+    enricher = make_enricher(sources, client)
+    pipeline = Pipeline(seen_jobs, notifier, crawl_state, enricher)
+    pipeline.start(companies={source.company for source in sources})
+    ctx = RunContext(seen_jobs, notifier, crawl_state, client, pipeline)
+    scheduler = PollScheduler(sources)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
         try:
-            # Construct search URL (Apply location filter in URL)
-            # location=united-states-USA provides better filtering
-            url = f"{APPLE_BASE_URL}?search={keyword}&sort=relevance&sort=date&location=united-states-USA"
-            print(f"    [-] Searching for '{keyword}'...")
-            
-            page.goto(url, timeout=60000)
-            
-            try:
-                page.wait_for_selector('h3 a', timeout=10000)
-            except:
-                print(f"    [!] No results or timeout for '{keyword}'")
-                continue
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows event loops
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+    async with async_playwright() as p:
+        browser, persistent = await launch_browser(p)
+        engine = Engine(browser, site_limits={source.name: source.concurrency for source in sources},
+                        persistent=persistent)
 
-            # Selector derived from inspection: div.job-list-item
-            # Container has class "job-list-item"
-            page.wait_for_selector('.job-list-item', timeout=10000)
-            rows = page.locator('.job-list-item').all()
-            
-            for row in rows[:20]: 
+        while not stop.is_set():
+            due = scheduler.due()
+            if not due:
                 try:
-                    title_link = row.locator('h3 a').first
-                    if not title_link.count(): continue
-                    
-                    title = title_link.inner_text().strip()
-                    href = title_link.get_attribute('href')
-                    
-                    if not href: continue
-                    
-                    # Seniority Check (Filter out >2 years experience roles)
-                    excluded_keywords = ["senior", "principal", "lead", "manager", "director", "sr.", " ii", " iii", " iv"]
-                    if any(kw in title.lower() for kw in excluded_keywords):
-                        continue
-                        
-                    # Domain Check (Filter out unrelated non-CS jobs)
-                    domain_keywords = ["software", "machine learning", "ml", "data", "ai", "artificial intelligence", "applied scientist", "swe", "developer"]
-                    if not any(dk in title.lower() for dk in domain_keywords):
-                        continue
-                    unrelated_keywords = ["hardware", "materials", "silicon", "mechanical", "electrical", "manufacturing"]
-                    if any(uk in title.lower() for uk in unrelated_keywords):
-                        continue
-
-                    # Location Check
-                    # Row text pattern: "... Location | City | Actions"
-                    full_text = row.inner_text()
-                    location = "Unknown"
-                    if "Location" in full_text:
-                        # Extract everything after "Location" and before "Actions" or end of line
-                        parts = full_text.split("Location")
-                        if len(parts) > 1:
-                            loc_part = parts[1].split("Actions")[0].replace("|", "").strip()
-                            location = loc_part
-                    
-                    # Since URL filter location=united-states-USA is active, 
-                    # we trust the results are US-based unless we see a non-US country.
-                    # This avoids blocking "Sunnyvale" or "Austin" which don't say "USA" in the list.
-                    non_us_countries = [" India", " China", " UK", " United Kingdom", " Germany", " Canada", " France"]
-                    if any(country.lower() in location.lower() for country in non_us_countries):
-                        continue
-
-                    job_id = href.split('/')[3] if len(href.split('/')) > 3 else href
-                    full_link = f"https://jobs.apple.com{href}"
-                    
-                    if job_id not in seen_jobs:
-                        job_data = {
-                            "id": job_id,
-                            "title": title,
-                            "company": "Apple",
-                            "location": location,
-                            "url": full_link
-                        }
-                        
-                        send_email_notification(job_data)
-                        send_discord_notification(job_data)
-                        seen_jobs.append(job_id)
-                        new_count += 1
-                        print(f"    [+] Found: {title} ({location})")
-                        
-                except Exception as e:
-                    # print(f"Row error: {e}")
-                    continue
-                    
-        except Exception as e:
-            print(f"[!] Apple scrape error for {keyword}: {e}")
-            
-    return new_count
-
-def scrape_nvidia(seen_jobs):
-    print(f"[*] Checking NVIDIA Careers: {datetime.now().strftime('%H:%M:%S')}")
-    new_count = 0
-    url = "https://nvidia.wd5.myworkdayjobs.com/wday/cxs/nvidia/NVIDIAExternalCareerSite/jobs"
-    headers = {"Content-Type": "application/json", "Accept": "application/json"}
-    payload = {"appliedFacets": {}, "limit": 20, "offset": 0, "searchText": "New Grad"}
-    
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
-            for job in data.get('jobPostings', []):
-                title = job.get('title', '')
-                href = job.get('externalPath', '')
-                location = job.get('locationsText', 'Unknown')
-                
-                bullets = job.get('bulletFields', [])
-                job_id = bullets[0] if bullets else href
-                
-                if not href:
-                    continue
-                    
-                full_link = f"https://nvidia.wd5.myworkdayjobs.com/NVIDIAExternalCareerSite{href}"
-                
-                # Domain Check
-                domain_keywords = ["software", "machine learning", "ml", "data", "ai", "artificial intelligence", "applied scientist", "swe", "developer", "research"]
-                if not any(dk in title.lower() for dk in domain_keywords):
-                    continue
-                    
-                unrelated_keywords = ["hardware", "materials", "silicon", "mechanical", "electrical", "manufacturing", "cad", "circuit", "asic", "signoff", "verification", "physical design"]
-                if any(uk in title.lower() for uk in unrelated_keywords):
-                    continue
-                    
-                # US Location Check (Workday locationsText can just be "2 Locations" so we also check href for US tags)
-                if not ("US" in location or "United States" in location or "/US-" in href):
-                    continue
-                    
-                if job_id not in seen_jobs:
-                    job_data = {
-                        "id": job_id,
-                        "title": title,
-                        "company": "NVIDIA",
-                        "location": location,
-                        "url": full_link
-                    }
-                    send_email_notification(job_data)
-                    send_discord_notification(job_data)
-                    seen_jobs.append(job_id)
-                    new_count += 1
-                    print(f"    [+] Found: {title}")
-    except Exception as e:
-        print(f"[!] NVIDIA scrape error: {e}")
-        
-    return new_count
+                    await asyncio.wait_for(stop.wait(), timeout=scheduler.seconds_until_next())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # A cycle is never interrupted: shutdown waits for in-flight polls to finish
+            cycle_metrics = metrics.reset()
+            crawl_state.new_run()
+            engine.timings = {}
+            engine.pool.block_stats = blocking.BlockStats()
+            client.reset_stats()
+            for source in due:
+                source.submit(engine, ctx)
+            await engine.run()
+            await asyncio.to_thread(pipeline.drain)
+            results = pipeline.take_counts()
+
+            for source in due:
+                counters = cycle_metrics.counters.get(source.name, {})
+                interval = scheduler.record(source, counters.get("new_postings", 0), counters.get("errors", 0) > 0)
+                print(f"[*] {source.name}: {results.get(source.name, 0)} new jobs, "
+                      f"{counters.get('new_postings', 0)} new postings; next poll in ~{interval:.0f} min")
+
+            with metrics.timer("db_save"):
+                save_seen_jobs(seen_jobs)
+                crawl_state.save()
+            if client.cache is not None:
+                client.cache.evict()
+            if enricher:
+                enricher.cache.evict()
+            cycle_metrics.append(
+                METRICS_FILE,
+                durations={site: end - start for site, (start, end) in engine.timings.items()},
+                new_jobs=results,
+                http={host: stats.as_dict() for host, stats in client.stats.items()},
+                browser=engine.pool.block_stats.as_dict(),
+            )
+
+        print("[*] Shutting down...")
+        await browser.close()
+    if PERSISTENT_BROWSER:
+        prune_browser_profile()
+
+    pipeline.close()
+    if enricher:
+        enricher.close()
+    notifier.close()
+    save_seen_jobs(seen_jobs)
+    crawl_state.save()
+    client.close()
+    print("[*] State saved, notifications flushed.")
 
 def run_scraper():
-    seen_jobs = load_seen_jobs()
-    print(f"[*] Loaded {len(seen_jobs)} previously seen jobs.")
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        
-        # 1. Microsoft
-        new_ms = scrape_microsoft(page, seen_jobs)
-        print(f"[*] Microsoft: Found {new_ms} new jobs.")
-        
-        # 2. Apple
-        new_apple = scrape_apple(page, seen_jobs)
-        print(f"[*] Apple: Found {new_apple} new jobs.")
-        
-        # 3. Microsoft AI
-        new_ms_ai = scrape_microsoft_ai(page, seen_jobs)
-        print(f"[*] Microsoft AI: Found {new_ms_ai} new jobs.")
-        
-        # 4. NVIDIA
-        new_nvidia = scrape_nvidia(seen_jobs)
-        print(f"[*] NVIDIA: Found {new_nvidia} new jobs.")
-        
-        if new_ms + new_apple + new_ms_ai + new_nvidia > 0:
-            print("[*] Updating database...")
-            save_seen_jobs(seen_jobs)
-        else:
-            print("[*] No new jobs found.")
-            
-        browser.close()
+    asyncio.run(run_scraper_async())
+
+def run_workers(count):
+    """Runs the sweep as `count` shard processes sharing the seen log and crawl state."""
+    # Load once up front so any migration of the log happens before the workers share it
+    load_seen_jobs()
+    # A shard without a company would only start and stop
+    count = min(count, len({source.company for source in load_sources(SOURCES_FILE)}))
+    failed = sharding.run_workers(count)
+    # Expire once, after every worker has appended
+    save_seen_jobs(load_seen_jobs())
+    return failed
+
+def merge_shards(shard_dirs):
+    """Folds the files written by separate shard jobs (e.g. a CI matrix) into this checkout's."""
+    seen_jobs = sharding.merge(shard_dirs, DB_FILE, CRAWL_STATE_FILE, METRICS_FILE, OUTBOX_FILE, DEAD_LETTER_FILE)
+    save_seen_jobs(seen_jobs)
+    print(f"[*] Seen store now holds {len(seen_jobs)} jobs.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch career sites for new job postings.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and poll each source on its own adaptive schedule")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="split the sources across this many processes, each with its own browser")
+    parser.add_argument("--shard", type=sharding.parse_shard, metavar="I/N",
+                        help="only run shard I (from 0) of N")
+    parser.add_argument("--merge", nargs="+", metavar="DIR",
+                        help="merge the seen log, crawl state, metrics and outbox written by shard runs in DIRs")
+    args = parser.parse_args()
+    if args.merge:
+        merge_shards(args.merge)
+    elif args.daemon:
+        asyncio.run(run_daemon_async())
+    elif args.shard:
+        asyncio.run(run_scraper_async(args.shard))
+    elif args.workers > 1:
+        sys.exit(1 if run_workers(args.workers) else 0)
+    else:
+        run_scraper()
 
 if __name__ == "__main__":
-    run_scraper()
+    main()
@@ -0,0 +1,110 @@
+import json
+from urllib.parse import urlparse
+
+import metrics
+from enrichment import html_to_text, parse_years, posted_date
+from scrapers import Scraper, register
+
+
+PAGE_SIZE = 20  # Workday's maximum
+HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+
+def api_url_for(careers_url):
+    """https://<tenant>.wd5.myworkdayjobs.com/<site> -> its /wday/cxs/<tenant>/<site>/jobs endpoint."""
+    parsed = urlparse(careers_url)
+    tenant = parsed.hostname.split(".")[0]
+    # Careers URLs may carry a locale prefix, e.g. /en-US/NVIDIAExternalCareerSite
+    site = [part for part in parsed.path.split("/") if part][-1]
+    return f"{parsed.scheme}://{parsed.hostname}/wday/cxs/{tenant}/{site}/jobs"
+
+
+def job_id_for(posting):
+    # externalPath ends in _<requisition ID> on every tenant (canonical.py extracts it);
+    # bulletFields[0] is the ID on some tenants but a location or date on others
+    return posting['externalPath']
+
+
+def parse_details(body):
+    """Detail fields (see enrichment.py) from a posting's JSON."""
+    info = json.loads(body)["jobPostingInfo"]
+    locations = [info.get("location")] + (info.get("additionalLocations") or [])
+    return {
+        "location": "; ".join(location for location in locations if location) or None,
+        "posted": posted_date(info.get("startDate")),
+        "years_experience": parse_years(html_to_text(info.get("jobDescription"))),
+    }
+
+
+@register("workday")
+class WorkdayScraper(Scraper):
+    """Any Workday tenant, from its public careers URL alone.
+
+    `url` is the careers site (e.g. https://nvidia.wd5.myworkdayjobs.com/NVIDIAExternalCareerSite);
+    each entry in `queries` is sent as Workday's searchText. HTTP only, so many
+    tenants can be watched side by side.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.api_url = config.get("api_url") or api_url_for(self.url)
+        self.site_url = self.url.rstrip("/")
+
+    def detail_request(self, job):
+        # The detail endpoint is the jobs endpoint's parent plus the posting's path
+        path = job["url"][len(self.site_url):]
+        return self.api_url.rsplit("/", 1)[0] + path, HEADERS, parse_details
+
+    def submit_query(self, engine, ctx, query):
+        engine.submit_http(self.name, self.scrape, ctx, query)
+
+    def scrape(self, ctx, query):
+        self.log_start(query)
+        emitted = 0
+        try:
+            for jobs in self.result_pages(ctx, query):
+                emitted += self.emit(ctx, jobs)
+        except Exception as e:
+            print(f"[!] {self.name} scrape error: {e}")
+            metrics.error(f"scrape error: {e}")
+
+        return emitted
+
+    def result_pages(self, ctx, query):
+        """A generator of one batch of jobs per result page, requested as the pipeline takes them.
+
+        Stops once a whole page is known, unless a sweep is due (see incremental.py).
+        """
+        key = self.state_key(query)
+        sweep = ctx.crawl_state.sweep_due(key)
+        total = 0
+        for page_number in range(self.max_pages):
+            payload = {"appliedFacets": {}, "limit": PAGE_SIZE, "offset": page_number * PAGE_SIZE, "searchText": query or ""}
+            response = ctx.client.post(self.api_url, json=payload, headers=HEADERS)
+            if response.status_code != 200:
+                print(f"[!] {self.name} returned HTTP {response.status_code}")
+                metrics.error(f"HTTP {response.status_code}")
+                return
+            data = response.json()
+            postings = [p for p in data.get('jobPostings', []) if p.get('externalPath')]
+            # Workday only reports the total on the first page
+            total = data.get('total') or total
+
+            # Results are sorted by relevance, not date, so only stop once a whole page is
+            # known; that page still goes through the pipeline so its sightings are recorded
+            caught_up = all((self.company, job_id_for(p)) in ctx.seen_jobs for p in postings)
+
+            yield [
+                {
+                    "id": job_id_for(posting),
+                    "title": posting.get('title', ''),
+                    "company": self.company,
+                    "location": posting.get('locationsText', 'Unknown'),
+                    "url": f"{self.site_url}{posting['externalPath']}"
+                }
+                for posting in postings
+            ]
+
+            if (caught_up and not sweep) or len(postings) < PAGE_SIZE or (page_number + 1) * PAGE_SIZE >= total:
+                break
+        ctx.pipeline.commit(self, key, swept=sweep)